@@ -54,6 +54,7 @@ class Settings(BaseSettings):
     # Diarization settings
     diarization_enabled: bool = True
     diarization_max_duration_sec: int = 600  # Skip diarization for calls > 10 minutes
+    diarization_device: Literal["cpu", "cuda"] = "cpu"
     huggingface_token: str | None = None  # Required for pyannote
 
     # Worker settings
@@ -87,6 +88,9 @@ class Settings(BaseSettings):
     watcher_enabled: bool = True
     watcher_poll_interval: int = 30  # seconds between folder scans
     watcher_stable_seconds: int = 10  # file must be unmodified for this long
+    watcher_hash_workers: int = 8  # threads used to hash new files in parallel
+    watcher_db_batch_size: int = 10000  # max values per IN (...) lookup query
+    watcher_recheck_polls: int = 20  # polls between full DB rechecks of known files
 
     # Source sync settings (for Google Drive integration)
     sync_enabled: bool = False  # Enable automatic syncing from source folder
@@ -3,7 +3,7 @@
 import logging
 import os
 import subprocess
-import tempfile
+import threading
 import warnings
 from dataclasses import dataclass
 from typing import Any
@@ -21,11 +21,13 @@ logging.getLogger("lightning_fabric").setLevel(logging.WARNING)
 logging.getLogger("pyannote").setLevel(logging.WARNING)
 
 try:
+    import numpy as np
     import torch
     import torchaudio
     from pyannote.audio import Pipeline
     HAS_DIARIZE_DEPS = True
 except ImportError:
+    np = None
     torch = None
     torchaudio = None
     Pipeline = None
@@ -36,11 +38,21 @@ from app.processors.transcribe import TranscriptSegment
 
 logger = logging.getLogger(__name__)
 
-# Module-level pipeline cache
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+
+# Module-level pipeline cache; the lock keeps concurrent first calls from
+# each loading their own copy of the model.
 _pipeline_cache: dict[str, Any] = {}
+_pipeline_lock = threading.Lock()
+# pyannote pipelines are not thread-safe; the background warmup and the
+# first task's diarize_audio take turns running them.
+_pipeline_run_lock = threading.Lock()
 
+# Resample transforms by source sample rate; building one computes its filter kernel
+_resampler_cache: dict[int, Any] = {}
 
-@dataclass
+
+@dataclass(slots=True)
 class DiarizationSegment:
     """A segment with speaker information."""
 
@@ -51,22 +63,47 @@ class DiarizationSegment:
 
 @dataclass
 class DiarizationResult:
-    """Result of speaker diarization."""
+    """Result of speaker diarization.
+
+    Segments are kept in (start, end) order so consumers can sweep them
+    without sorting again.
+    """
 
     segments: list[DiarizationSegment]
     speaker_count: int
     speakers: list[str]
 
+    def __post_init__(self) -> None:
+        segments = self.segments
+        if any(
+            (segments[i].start, segments[i].end) > (segments[i + 1].start, segments[i + 1].end)
+            for i in range(len(segments) - 1)
+        ):
+            self.segments = sorted(segments, key=lambda d: (d.start, d.end))
+
 
-def get_or_load_pipeline() -> Any:
+def get_or_load_pipeline(model_name: str = DIARIZATION_MODEL, device: str = "cpu") -> Any:
     """Get cached diarization pipeline or load a new one.
 
+    Args:
+        model_name: HuggingFace id of the pyannote pipeline
+        device: Torch device to run the pipeline on
+
     Returns:
         The pyannote diarization Pipeline instance
     """
-    settings = get_settings()
+    cache_key = f"{model_name}:{device}"
+
+    pipeline = _pipeline_cache.get(cache_key)
+    if pipeline is not None:
+        return pipeline
+
+    with _pipeline_lock:
+        if cache_key in _pipeline_cache:
+            return _pipeline_cache[cache_key]
+
+        settings = get_settings()
 
-    if "pipeline" not in _pipeline_cache:
         if not settings.huggingface_token:
             logger.warning(
                 "No HuggingFace token provided. Diarization may fail. "
@@ -87,27 +124,54 @@ def get_or_load_pipeline() -> Any:
             logger.info(f"Loading pyannote speaker diarization pipeline... (torch_threads={settings.torch_threads})")
             if settings.torch_threads > 0:
                 torch.set_num_threads(settings.torch_threads)
-            
-            pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-            )
-            pipeline = pipeline.to(torch.device("cpu"))
-            _pipeline_cache["pipeline"] = pipeline
+
+            pipeline = Pipeline.from_pretrained(model_name)
+            pipeline = pipeline.to(torch.device(device))
+            _pipeline_cache[cache_key] = pipeline
             logger.info("Diarization pipeline loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load diarization pipeline: {e}")
             raise
 
-    return _pipeline_cache["pipeline"]
+    return pipeline
 
 
-def _load_audio_as_waveform(audio_path: str) -> tuple[Any, int]:
+def warmup() -> None:
+    """Load the diarization pipeline and run it once on 1s of silence.
+
+    Moves model download/initialisation and first-call kernel setup out of
+    the first real request. Failures are logged, not raised: a worker that
+    cannot warm up still starts, and diarize_audio reports the error per file.
+    """
+    settings = get_settings()
+    if not settings.diarization_enabled:
+        return
+
+    try:
+        pipeline = get_or_load_pipeline(device=settings.diarization_device)
+        with _pipeline_run_lock, torch.inference_mode():
+            pipeline({"waveform": torch.zeros(1, 16000), "sample_rate": 16000})
+        logger.info("Diarization pipeline warmed up")
+    except Exception as e:
+        logger.warning(f"Diarization warmup failed: {e}")
+
+
+def _get_resampler(sample_rate: int) -> Any:
+    """Get a cached transform resampling ``sample_rate`` audio to 16kHz."""
+    if sample_rate not in _resampler_cache:
+        _resampler_cache[sample_rate] = torchaudio.transforms.Resample(sample_rate, 16000)
+    return _resampler_cache[sample_rate]
+
+
+def _load_audio_as_waveform(audio_path: str, pin_memory: bool = False) -> tuple[Any, int]:
     """Load audio file as waveform tensor for pyannote.
 
-    Handles m4a and other formats by converting to WAV via ffmpeg.
+    Handles m4a and other formats by decoding to raw PCM via ffmpeg.
 
     Args:
         audio_path: Path to the audio file
+        pin_memory: Page-lock the tensor so a CUDA pipeline can copy it to
+            the GPU asynchronously
 
     Returns:
         Tuple of (waveform tensor, sample_rate)
@@ -123,38 +187,37 @@ def _load_audio_as_waveform(audio_path: str) -> tuple[Any, int]:
         waveform, sample_rate = torchaudio.load(audio_path)
         # Resample to 16kHz mono for pyannote
         if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-            waveform = resampler(waveform)
+            waveform = _get_resampler(sample_rate)(waveform)
             sample_rate = 16000
         if waveform.shape[0] > 1:
             waveform = waveform.mean(dim=0, keepdim=True)
+        if pin_memory:
+            waveform = waveform.pin_memory()
         return waveform, sample_rate
     except Exception as e:
         logger.debug(f"Direct load failed, trying ffmpeg conversion: {e}")
     
-    # Convert via ffmpeg for formats like m4a
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-        temp_wav = f.name
-    
+    # Decode via ffmpeg for formats like m4a, streaming 16kHz mono PCM over stdout
     try:
-        try:
-            # Use absolute path to prevent argument injection if filename starts with '-'
-            abs_audio_path = os.path.abspath(audio_path)
-            subprocess.run(
-                ['ffmpeg', '-y', '-i', abs_audio_path, '-ar', '16000', '-ac', '1', '-f', 'wav', temp_wav],
-                capture_output=True,
-                check=True,
-                text=True,
-            )
-        except subprocess.CalledProcessError as e:
-            logger.error(f"ffmpeg conversion failed (exit code {e.returncode}): {e.stderr}")
-            raise RuntimeError(f"Failed to convert audio to WAV via ffmpeg: {e.stderr}") from e
+        # Use absolute path to prevent argument injection if filename starts with '-'
+        abs_audio_path = os.path.abspath(audio_path)
+        proc = subprocess.run(
+            ['ffmpeg', '-i', abs_audio_path, '-ar', '16000', '-ac', '1', '-f', 's16le', '-'],
+            capture_output=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+        logger.error(f"ffmpeg conversion failed (exit code {e.returncode}): {stderr}")
+        raise RuntimeError(f"Failed to convert audio to WAV via ffmpeg: {stderr}") from e
 
-        waveform, sample_rate = torchaudio.load(temp_wav)
-        return waveform, sample_rate
-    finally:
-        if os.path.exists(temp_wav):
-            os.unlink(temp_wav)
+    # One float32 buffer, scaled in place: no second full-length temporary
+    samples = np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32)
+    samples *= 1.0 / 32768.0
+    waveform = torch.from_numpy(samples).unsqueeze(0)
+    if pin_memory:
+        waveform = waveform.pin_memory()
+    return waveform, 16000
 
 
 def diarize_audio(audio_path: str, num_speakers: int | None = None) -> DiarizationResult:
@@ -176,10 +239,12 @@ def diarize_audio(audio_path: str, num_speakers: int | None = None) -> Diarizati
     logger.info(f"Running diarization on: {audio_path}")
 
     # Load audio as waveform (handles m4a conversion)
-    waveform, sample_rate = _load_audio_as_waveform(audio_path)
+    waveform, sample_rate = _load_audio_as_waveform(
+        audio_path, pin_memory=settings.diarization_device == "cuda"
+    )
     logger.info(f"Loaded audio: {waveform.shape[1]/sample_rate:.1f}s @ {sample_rate}Hz")
 
-    pipeline = get_or_load_pipeline()
+    pipeline = get_or_load_pipeline(device=settings.diarization_device)
     
     # Pass pre-loaded audio to avoid pyannote's audio loading issues
     # Pass num_speakers if provided
@@ -187,7 +252,9 @@ def diarize_audio(audio_path: str, num_speakers: int | None = None) -> Diarizati
     if num_speakers:
         kwargs["num_speakers"] = num_speakers
 
-    diarization_output = pipeline({'waveform': waveform, 'sample_rate': sample_rate}, **kwargs)
+    # No autograd bookkeeping: this is pure inference
+    with _pipeline_run_lock, torch.inference_mode():
+        diarization_output = pipeline({'waveform': waveform, 'sample_rate': sample_rate}, **kwargs)
 
     # Handle pyannote 4.0 output format (DiarizeOutput object)
     if hasattr(diarization_output, 'speaker_diarization'):
@@ -196,20 +263,11 @@ def diarize_audio(audio_path: str, num_speakers: int | None = None) -> Diarizati
         # Fallback for older pyannote versions
         annotation = diarization_output
 
-    segments: list[DiarizationSegment] = []
-    speakers_set: set[str] = set()
-
-    for turn, _, speaker in annotation.itertracks(yield_label=True):
-        segments.append(
-            DiarizationSegment(
-                start=turn.start,
-                end=turn.end,
-                speaker=speaker,
-            )
-        )
-        speakers_set.add(speaker)
-
-    speakers = sorted(speakers_set)
+    segments = [
+        DiarizationSegment(start=turn.start, end=turn.end, speaker=speaker)
+        for turn, _, speaker in annotation.itertracks(yield_label=True)
+    ]
+    speakers = sorted({segment.speaker for segment in segments})
 
     logger.info(f"Diarization complete: {len(segments)} segments, {len(speakers)} speakers")
 
@@ -241,41 +299,33 @@ def assign_speakers_to_transcript(
 
     result: list[TranscriptSegment] = []
 
-    # Optimizing to O(N+M) using sliding window
-    d_idx = 0
-    num_d_segments = len(diarization.segments)
+    # DiarizationResult keeps its turns in start order, as the sweep needs
+    d_segments = diarization.segments
+
+    # Sweep with an active set: turns enter once they start before the current
+    # segment ends and leave once they end before it starts, so each segment only
+    # compares against the turns overlapping it. A long turn no longer keeps
+    # every later short turn in the scan.
+    next_idx = 0
+    num_d_segments = len(d_segments)
+    active: list[DiarizationSegment] = []
 
     for tseg in transcript_segments:
+        while next_idx < num_d_segments and d_segments[next_idx].start < tseg.end:
+            active.append(d_segments[next_idx])
+            next_idx += 1
+        # Since tseg.start increases monotonically, dropped turns never overlap
+        # a later transcript segment. Filtering keeps start order for ties.
+        active = [dseg for dseg in active if dseg.end > tseg.start]
+
         best_speaker = None
         best_overlap = 0.0
-
-        # Advance d_idx to skip segments that end before current tseg starts.
-        # Since tseg.start increases monotonically, we never need to check
-        # these skipped segments again for subsequent transcript segments.
-        while d_idx < num_d_segments and diarization.segments[d_idx].end < tseg.start:
-            d_idx += 1
-
-        # Check segments starting from d_idx
-        current_idx = d_idx
-        while current_idx < num_d_segments:
-            dseg = diarization.segments[current_idx]
-
-            # Optimization: if dseg starts after tseg ends, no further overlap possible
-            # for this tseg. Since dseg.start is sorted, subsequent dsegs also start later.
-            if dseg.start > tseg.end:
-                break
-
-            # Calculate overlap
-            overlap_start = max(tseg.start, dseg.start)
-            overlap_end = min(tseg.end, dseg.end)
-            overlap = max(0, overlap_end - overlap_start)
-
+        for dseg in active:
+            overlap = min(tseg.end, dseg.end) - max(tseg.start, dseg.start)
             if overlap > best_overlap:
                 best_overlap = overlap
                 best_speaker = dseg.speaker
 
-            current_idx += 1
-
         result.append(
             TranscriptSegment(
                 start=tseg.start,
@@ -5,6 +5,19 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+# Compiled once at import; these run for every file the watcher picks up.
+_EXTENSION_RE = re.compile(r'\.[^.]+$')
+# Call recording <phone>_<date>_<time>
+# Phone can be: +international, local digits, or _shortcode
+_RECORDING_RE = re.compile(r'Call recording\s+(.+?)_(\d{6})_(\d{6})$', re.IGNORECASE)
+# Same tail without the "Call recording" prefix
+_BARE_RECORDING_RE = re.compile(r'^(.+?)_(\d{6})_(\d{6})$')
+_NON_DIGIT_RE = re.compile(r'\D')
+# Deletes ASCII digits so the digit count is a length difference
+_STRIP_DIGITS = str.maketrans('', '', '0123456789')
+# Deletes every ASCII character except digits
+_KEEP_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
 
 @dataclass
 class CallerMetadata:
@@ -16,6 +29,53 @@ class CallerMetadata:
     raw_phone: Optional[str] = None  # Original phone string before normalization
 
 
+_PREFIX = 'Call recording '
+# '_' + YYMMDD + '_' + HHMMSS
+_SUFFIX_LEN = 14
+
+
+def _split_recording_name(filename: str) -> Optional[tuple[str, str, str]]:
+    """
+    Split a recording filename into (identifier, YYMMDD, HHMMSS).
+
+    The usual 'Call recording <id>_<date>_<time>.<ext>' shape is checked by
+    position; anything else goes through the regexes.
+
+    Args:
+        filename: The recording filename to split
+
+    Returns:
+        The stripped identifier and the date/time digit strings, or None
+    """
+    stem, dot, ext = filename.rpartition('.')
+    if (
+        dot
+        and ext
+        and stem.startswith(_PREFIX)
+        and len(stem) > len(_PREFIX) + _SUFFIX_LEN
+        and stem[-14] == '_'
+        and stem[-7] == '_'
+        and stem[-13:-7].isdecimal()
+        and stem[-6:].isdecimal()
+    ):
+        identifier = stem[len(_PREFIX):-_SUFFIX_LEN]
+        if '\n' not in identifier:
+            return identifier.strip(), stem[-13:-7], stem[-6:]
+
+    # Remove file extension
+    name_without_ext = _EXTENSION_RE.sub('', filename)
+
+    match = _RECORDING_RE.match(name_without_ext)
+
+    if not match:
+        # Try alternative pattern without "Call recording" prefix
+        match = _BARE_RECORDING_RE.match(name_without_ext)
+
+    if not match:
+        return None
+    return match.group(1).strip(), match.group(2), match.group(3)
+
+
 def parse_recording_filename(filename: str) -> CallerMetadata:
     """
     Parse caller metadata from a recording filename.
@@ -35,23 +95,10 @@ def parse_recording_filename(filename: str) -> CallerMetadata:
     """
     metadata = CallerMetadata()
 
-    # Remove file extension
-    name_without_ext = re.sub(r'\.[^.]+$', '', filename)
-
-    # Pattern to match: Call recording <phone>_<date>_<time>
-    # Phone can be: +international, local digits, or _shortcode
-    pattern = r'Call recording\s+(.+?)_(\d{6})_(\d{6})$'
-    match = re.match(pattern, name_without_ext, re.IGNORECASE)
-
-    if not match:
-        # Try alternative pattern without "Call recording" prefix
-        alt_pattern = r'^(.+?)_(\d{6})_(\d{6})$'
-        match = re.match(alt_pattern, name_without_ext)
+    parts = _split_recording_name(filename)
 
-    if match:
-        identifier = match.group(1).strip()
-        date_str = match.group(2)
-        time_str = match.group(3)
+    if parts:
+        identifier, date_str, time_str = parts
 
         # Determine if identifier is a phone number or contact name
         # Phone numbers: start with +, _, or are mostly digits
@@ -121,9 +168,13 @@ def is_phone_number(identifier: str) -> bool:
     if identifier.startswith('_'):
         return True
 
-    # Count digits vs total characters
-    digits = sum(1 for c in identifier if c.isdigit())
+    # Count digits vs total characters. ASCII identifiers (the common case)
+    # are counted in C; anything else may contain non-ASCII digits.
     total = len(identifier)
+    if identifier.isascii():
+        digits = total - len(identifier.translate(_STRIP_DIGITS))
+    else:
+        digits = sum(1 for c in identifier if c.isdigit())
 
     # If more than 50% digits and at least 3 digits, it's a phone number
     if total > 0 and digits >= 3 and (digits / total) > 0.5:
@@ -139,6 +190,13 @@ def is_phone_number(identifier: str) -> bool:
     return digits >= 3
 
 
+def _digits_only(value: str) -> str:
+    """Drop every non-digit character, keeping non-ASCII digits like \\d does."""
+    if value.isascii():
+        return value.translate(_KEEP_DIGITS)
+    return _NON_DIGIT_RE.sub('', value)
+
+
 def normalize_phone_number(raw_phone: str) -> Optional[str]:
     """
     Normalize a phone number string.
@@ -162,12 +220,13 @@ def normalize_phone_number(raw_phone: str) -> Optional[str]:
     # Remove any non-digit characters except leading +
     if phone.startswith('+'):
         # International format: keep the +
-        digits = '+' + re.sub(r'\D', '', phone[1:])
+        digits = '+' + _digits_only(phone[1:])
+        digit_count = len(digits) - 1
     else:
-        digits = re.sub(r'\D', '', phone)
+        digits = _digits_only(phone)
+        digit_count = len(digits)
 
     # Validate: must have at least 3 digits
-    digit_count = len(re.sub(r'\D', '', digits))
     if digit_count < 3:
         return None
 
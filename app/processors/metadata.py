@@ -26,21 +26,20 @@ class AudioMetadata:
     raw_metadata: dict[str, Any]
 
 
-def compute_file_hash(file_path: str, chunk_size: int = 8192) -> str:
+def compute_file_hash(file_path: str) -> str:
     """Compute SHA256 hash of a file.
 
+    hashlib.file_digest reads into a reused buffer and digests it without
+    holding the GIL, so memory use stays flat regardless of file size.
+
     Args:
         file_path: Path to the file
-        chunk_size: Size of chunks to read
 
     Returns:
         Hex-encoded SHA256 hash
     """
-    sha256 = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
 def extract_metadata(audio_path: str) -> AudioMetadata:
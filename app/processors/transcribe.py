@@ -20,7 +20,7 @@ except ImportError:
 _model_cache: dict[str, Any] = {}
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptSegment:
     """A single segment of transcription."""
 
@@ -3,14 +3,23 @@
 Supports optional sync from a source folder (e.g., Google Drive) in batches.
 """
 
+import heapq
 import logging
+import os
 import shutil
 import signal
 import sys
+import threading
 import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
 from app.config import get_settings
 from app.db.models import Recording, RecordingStatus
 from app.db.session import SyncSessionLocal
@@ -38,6 +47,9 @@ class FolderWatcher:
         sync_enabled: bool = False,
         source_folder: str | Path | None = None,
         sync_batch_size: int = 20,
+        hash_workers: int = 8,
+        db_batch_size: int = 10000,
+        recheck_polls: int = 20,
     ):
         """
         Initialize the folder watcher.
@@ -50,20 +62,43 @@ class FolderWatcher:
             sync_enabled: Enable automatic syncing from source folder
             source_folder: Source folder to sync from (e.g., Google Drive)
             sync_batch_size: Number of files to copy per sync batch
+            hash_workers: Threads used to hash files concurrently
+            db_batch_size: Maximum values per IN (...) lookup query
+            recheck_polls: Polls between full database rechecks of known files
         """
         self.folder = Path(folder)
         self.poll_interval = poll_interval
         self.stable_seconds = stable_seconds
         self.audio_extensions = audio_extensions
+        # Lowercased once so the scan's per-entry check is a set lookup
+        self._audio_suffixes = frozenset(ext.lower() for ext in audio_extensions)
         self._running = False
+        # Set by stop() to wake the loop out of its wait between polls
+        self._stop_event = threading.Event()
         self._last_sizes: dict[str, int] = {}
+        # Files (keyed like _last_sizes) already in the database, so later
+        # polls skip hashing and querying them. An entry is dropped when a poll
+        # sees the file being written, resized or removed, and the whole set
+        # every recheck_polls polls. Until then, a deleted row, a database
+        # restored from backup, or a same-size rewrite between two polls goes
+        # unnoticed. The set holds at most one entry per file in the folder.
+        self._known_files: set[str] = set()
+        self._poll_count = 0
         
         # Sync settings
         self.sync_enabled = sync_enabled
         self.source_folder = Path(source_folder) if source_folder else None
         self.sync_batch_size = sync_batch_size
+        self.hash_workers = hash_workers
+        self.db_batch_size = db_batch_size
+        self.recheck_polls = recheck_polls
+
+    @staticmethod
+    def _cache_key(file_path: str | Path) -> str:
+        """Key for a file in the size cache and known-file set."""
+        return os.fspath(file_path)
 
-    def is_file_ready(self, file_path: Path) -> bool:
+    def is_file_ready(self, file_path: Path, stat: os.stat_result | None = None) -> bool:
         """
         Check if a file is ready for processing.
 
@@ -73,25 +108,30 @@ class FolderWatcher:
 
         Args:
             file_path: Path to the file to check
+            stat: Stat result from the folder scan; the file is stat'ed if omitted
 
         Returns:
             True if file is ready for processing
         """
-        try:
-            stat = file_path.stat()
-        except OSError as e:
-            logger.warning(f"Cannot stat file {file_path}: {e}")
-            return False
+        if stat is None:
+            try:
+                stat = file_path.stat()
+            except OSError as e:
+                logger.warning(f"Cannot stat file {file_path}: {e}")
+                return False
+
+        file_key = self._cache_key(file_path)
 
         # Check 1: mtime must be old enough
         mtime_age = time.time() - stat.st_mtime
         if mtime_age < self.stable_seconds:
+            # Being written: look it up again once it settles
+            self._known_files.discard(file_key)
             logger.debug(f"File {file_path.name} too recent (age={mtime_age:.1f}s < {self.stable_seconds}s)")
             return False
 
         # Check 2: size must be stable
         current_size = stat.st_size
-        file_key = str(file_path)
         last_size = self._last_sizes.get(file_key)
         self._last_sizes[file_key] = current_size
 
@@ -100,11 +140,33 @@ class FolderWatcher:
             return False
 
         if last_size != current_size:
+            self._known_files.discard(file_key)
             logger.debug(f"File {file_path.name} size changed: {last_size} -> {current_size}")
             return False
 
         return True
 
+    def _iter_audio_entries(self, root: str | Path) -> Iterator[os.DirEntry]:
+        """
+        Yield directory entries for audio files under root, recursively.
+
+        os.scandir reports file types from the directory listing, so files are
+        only stat'ed when a caller asks for entry.stat(). Like Path.rglob,
+        symlinked directories are not descended into.
+        """
+        try:
+            entries = os.scandir(root)
+        except OSError as e:
+            logger.debug(f"Cannot scan {root}: {e}")
+            return
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_audio_entries(entry.path)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in self._audio_suffixes:
+                    yield entry
+
     def scan_folder(self) -> list[Path]:
         """
         Scan folder for audio files recursively.
@@ -112,7 +174,24 @@ class FolderWatcher:
         Returns:
             List of audio file paths
         """
-        return [f for f in self.folder.rglob("*") if f.is_file() and f.suffix.lower() in self.audio_extensions]
+        return [Path(entry.path) for entry in self._iter_audio_entries(self.folder)]
+
+    def scan_folder_stats(self) -> list[tuple[Path, os.stat_result]]:
+        """
+        Scan folder for audio files recursively, with their stat results.
+
+        Files that disappear between listing and stat are left out.
+
+        Returns:
+            List of (audio file path, stat result) pairs
+        """
+        files = []
+        for entry in self._iter_audio_entries(self.folder):
+            try:
+                files.append((Path(entry.path), entry.stat()))
+            except OSError as e:
+                logger.warning(f"Cannot stat file {entry.path}: {e}")
+        return files
 
     def scan_source_folder(self) -> list[Path]:
         """
@@ -124,14 +203,47 @@ class FolderWatcher:
         if not self.source_folder or not self.source_folder.exists():
             return []
         
-        return [f for f in self.source_folder.rglob("*") if f.is_file() and f.suffix.lower() in self.audio_extensions]
+        return [Path(entry.path) for entry in self._iter_audio_entries(self.source_folder)]
 
-    def get_pending_count_in_folder(self) -> int:
+    def _hash_files(self, file_paths: list[Path]) -> dict[Path, str]:
+        """
+        Hash files concurrently.
+
+        Hashing is dominated by file reads, and hashlib releases the GIL while
+        digesting, so threads overlap well. Files that cannot be hashed are
+        logged and left out.
+
+        Args:
+            file_paths: Files to hash
+
+        Returns:
+            Mapping of file path to hash, in input order
+        """
+        def hash_one(file_path: Path) -> str | None:
+            try:
+                return compute_file_hash(str(file_path))
+            except Exception as e:
+                logger.warning(f"Cannot compute hash for {file_path}: {e}")
+                return None
+
+        if len(file_paths) > 1 and self.hash_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="file-hash") as executor:
+                hashes = list(executor.map(hash_one, file_paths))
+        else:
+            hashes = [hash_one(f) for f in file_paths]
+
+        return {f: h for f, h in zip(file_paths, hashes) if h is not None}
+
+    def get_pending_count_in_folder(self, limit: int | None = None) -> int:
         """
         Count files in calls folder that are not yet in the database.
+
+        Args:
+            limit: Stop counting (and hashing) once this many pending files
+                are found. None counts every file.
         
         Returns:
-            Number of pending files
+            Number of pending files, at most limit
         """
         audio_files = self.scan_folder()
         if not audio_files:
@@ -144,7 +256,7 @@ class FolderWatcher:
             # Map absolute path strings
             file_paths = [str(f.absolute()) for f in audio_files]
             existing_paths = set()
-            batch_size = 10000
+            batch_size = self.db_batch_size
 
             for i in range(0, len(file_paths), batch_size):
                 batch = file_paths[i:i + batch_size]
@@ -161,31 +273,24 @@ class FolderWatcher:
             if not candidates:
                 return 0
 
-            # 2. Check by hash for remaining candidates
-            candidate_hashes = {}
-            for f in candidates:
-                try:
-                    h = compute_file_hash(str(f))
-                    candidate_hashes[f] = h
-                except Exception as e:
-                    logger.warning(f"Cannot compute hash for {f}: {e}")
-
-            hashes_to_check = list(candidate_hashes.values())
-            existing_hashes = set()
-
-            if hashes_to_check:
-                for i in range(0, len(hashes_to_check), batch_size):
-                    batch = hashes_to_check[i:i + batch_size]
-                    if not batch:
-                        continue
-                    results = session.query(Recording.file_hash).filter(
-                        Recording.file_hash.in_(batch)
-                    ).all()
-                    existing_hashes.update(r[0] for r in results)
-
-            for f in candidates:
-                if f in candidate_hashes and candidate_hashes[f] not in existing_hashes:
-                    pending += 1
+            # 2. Check by hash for remaining candidates. Candidates are hashed
+            # a window at a time so that a caller with a limit stops hashing
+            # as soon as the limit is reached.
+            start = 0
+            while start < len(candidates) and (limit is None or pending < limit):
+                window_size = batch_size if limit is None else min(batch_size, limit - pending)
+                window = candidates[start:start + window_size]
+                start += window_size
+
+                candidate_hashes = self._hash_files(window)
+                if not candidate_hashes:
+                    continue
+
+                results = session.query(Recording.file_hash).filter(
+                    Recording.file_hash.in_(list(candidate_hashes.values()))
+                ).all()
+                existing_hashes = {r[0] for r in results}
+                pending += sum(1 for h in candidate_hashes.values() if h not in existing_hashes)
 
         finally:
             session.close()
@@ -214,38 +319,49 @@ class FolderWatcher:
         calls_files = {str(f.relative_to(self.folder)) for f in self.scan_folder()}
         source_files = self.scan_source_folder()
         
-        # Get files that are already processed (in database)
-        processed_hashes: set[str] = set()
+        # Find files to sync, oldest first. A heap gives the next-oldest file
+        # without sorting the whole backlog, and files are only hashed a
+        # batch-sized window at a time until the batch is full.
+        unsynced: list[tuple[float, Path]] = []
+        for source_file in source_files:
+            if str(source_file.relative_to(self.source_folder)) in calls_files:
+                continue
+            try:
+                unsynced.append((source_file.stat().st_mtime, source_file))
+            except OSError as e:
+                logger.warning(f"Cannot stat file {source_file}: {e}")
+        pending_count = len(unsynced)
+        heapq.heapify(unsynced)
+
+        batch: list[Path] = []
         session = SyncSessionLocal()
         try:
-            # We rely on hash for deduplication across different locations/filenames
-            recordings = session.query(Recording.file_hash).all()
-            processed_hashes = {r.file_hash for r in recordings}
+            while unsynced and len(batch) < self.sync_batch_size:
+                window_size = min(self.sync_batch_size - len(batch), len(unsynced))
+                window = [heapq.heappop(unsynced)[1] for _ in range(window_size)]
+                window_hashes = self._hash_files(window)
+                if not window_hashes:
+                    continue
+
+                # Check if already processed by hash. We rely on hash for
+                # deduplication across different locations/filenames, and only
+                # fetch the hashes in this window rather than the whole table.
+                recordings = session.query(Recording.file_hash).filter(
+                    Recording.file_hash.in_(list(window_hashes.values()))
+                ).all()
+                processed_hashes = {r.file_hash for r in recordings}
+                batch.extend(
+                    f for f, file_hash in window_hashes.items()
+                    if file_hash not in processed_hashes
+                )
         finally:
             session.close()
-        
-        # Find files to sync
-        candidates: list[Path] = []
-        for source_file in source_files:
-            rel_path = str(source_file.relative_to(self.source_folder))
-            if rel_path not in calls_files:
-                # Check if already processed by hash
-                try:
-                    file_hash = compute_file_hash(str(source_file))
-                    if file_hash not in processed_hashes:
-                        candidates.append(source_file)
-                except Exception as e:
-                    logger.warning(f"Cannot compute hash for {source_file}: {e}")
-        
-        if not candidates:
+
+        if not batch:
             logger.debug("No new files to sync from source")
             return 0
-        
-        # Sort by modification time (oldest first) and take batch
-        candidates.sort(key=lambda f: f.stat().st_mtime)
-        batch = candidates[:self.sync_batch_size]
-        
-        logger.info(f"Syncing {len(batch)} files from source ({len(candidates)} total pending)")
+
+        logger.info(f"Syncing {len(batch)} files from source ({pending_count} not yet in calls folder)")
         
         copied = 0
         for source_file in batch:
@@ -263,11 +379,30 @@ class FolderWatcher:
         return copied
 
     def clean_stale_cache(self, current_files: set[str]) -> None:
-        """Remove deleted files from size cache."""
-        stale_keys = [k for k in self._last_sizes if k not in current_files]
+        """Remove deleted files from size cache and known-file set."""
+        stale_keys = self._last_sizes.keys() - current_files
         for key in stale_keys:
             del self._last_sizes[key]
             logger.debug(f"Removed stale cache entry: {key}")
+        self._known_files &= current_files
+
+    def _query_existing(self, session: Session, column: Any, values: list[str]) -> set[str]:
+        """
+        Find which values already appear in a Recording column.
+
+        Args:
+            session: Database session
+            column: Recording column to match against, e.g. Recording.file_hash
+            values: Values to look up, queried in chunks of db_batch_size
+
+        Returns:
+            The subset of values present in the database
+        """
+        existing: set[str] = set()
+        for i in range(0, len(values), self.db_batch_size):
+            rows = session.query(column).filter(column.in_(values[i:i + self.db_batch_size])).all()
+            existing.update(getattr(r, column.key) for r in rows)
+        return existing
 
     def process_batch(self, file_paths: list[Path]) -> int:
         """
@@ -279,15 +414,39 @@ class FolderWatcher:
         Returns:
             Number of files queued
         """
+        # Files seen in the database on an earlier poll need no hash or query
+        file_paths = [fp for fp in file_paths if self._cache_key(fp) not in self._known_files]
         if not file_paths:
             return 0
 
-        # 1. Compute hashes for all files
+        # Use absolute paths for DB check
+        abs_paths = {fp: str(fp.absolute()) for fp in file_paths}
+
+        # 1. Check by path first. A file already recorded at its path is
+        # skipped whatever its contents, so it never needs hashing; this keeps
+        # a restarted watcher from re-reading every file in the folder.
+        session = SyncSessionLocal()
+        try:
+            existing_paths = self._query_existing(session, Recording.file_path, list(abs_paths.values()))
+        except Exception as e:
+            logger.error(f"Error processing batch: {e}")
+            return 0
+        finally:
+            session.close()
+
+        candidates = []
+        for fp in file_paths:
+            if abs_paths[fp] in existing_paths:
+                logger.debug(f"File {abs_paths[fp]} already in database by path")
+                self._known_files.add(self._cache_key(fp))
+            else:
+                candidates.append(fp)
+
+        # 2. Compute hashes for the remaining files
         # Map file_path -> (hash, size)
         file_info: dict[Path, dict] = {}
-        for fp in file_paths:
+        for fp, h in self._hash_files(candidates).items():
             try:
-                h = compute_file_hash(str(fp))
                 file_info[fp] = {"hash": h, "size": fp.stat().st_size}
             except Exception as e:
                 logger.error(f"Error preparing file {fp}: {e}")
@@ -296,62 +455,44 @@ class FolderWatcher:
         if not file_info:
             return 0
 
-        all_hashes = [info["hash"] for info in file_info.values()]
-        # Use absolute paths for DB check
-        all_paths = [str(fp.absolute()) for fp in file_info.keys()]
-
         session = SyncSessionLocal()
         queued_count = 0
         try:
-            # 2. Check existing recordings
-            existing_hashes = set()
-            existing_paths = set()
-
-            chunk_size = 10000
-            for i in range(0, len(all_hashes), chunk_size):
-                chunk = all_hashes[i:i+chunk_size]
-                if chunk:
-                    res = session.query(Recording.file_hash).filter(Recording.file_hash.in_(chunk)).all()
-                    existing_hashes.update(r.file_hash for r in res)
+            # 3. Check existing recordings by hash
+            all_hashes = [info["hash"] for info in file_info.values()]
+            existing_hashes = self._query_existing(session, Recording.file_hash, all_hashes)
 
-            for i in range(0, len(all_paths), chunk_size):
-                chunk = all_paths[i:i+chunk_size]
-                if chunk:
-                    res = session.query(Recording.file_path).filter(Recording.file_path.in_(chunk)).all()
-                    existing_paths.update(r.file_path for r in res)
-
-            # 3. Filter and Add
+            # 4. Filter and Add
             to_add = []
+            known = []
             for fp, info in file_info.items():
+                known.append(self._cache_key(fp))
                 if info["hash"] in existing_hashes:
                     logger.debug(f"File {fp.name} already in database by hash")
                     continue
-                
-                abs_path = str(fp.absolute())
-                if abs_path in existing_paths:
-                    logger.debug(f"File {abs_path} already in database by path")
-                    continue
 
-                recording = Recording(
-                    file_path=abs_path,
-                    file_name=fp.name,
-                    file_hash=info["hash"],
-                    file_size=info["size"],
-                    status=RecordingStatus.QUEUED,
-                )
-                to_add.append(recording)
+                to_add.append({
+                    "id": uuid.uuid4(),
+                    "file_path": abs_paths[fp],
+                    "file_name": fp.name,
+                    "file_hash": info["hash"],
+                    "file_size": info["size"],
+                    "status": RecordingStatus.QUEUED,
+                })
 
-                # Update sets for intra-batch deduplication
+                # Update set for intra-batch deduplication
                 existing_hashes.add(info["hash"])
-                existing_paths.add(abs_path)
 
             if to_add:
-                session.add_all(to_add)
+                # Bulk INSERT of plain rows: no ORM objects or unit-of-work
+                # bookkeeping per file. Ids are generated here for logging.
+                session.execute(insert(Recording), to_add)
                 session.commit()
-                for r in to_add:
-                     logger.info(f"Queued new file: {r.file_name} (id={r.id})")
+                for row in to_add:
+                    logger.info(f"Queued new file: {row['file_name']} (id={row['id']})")
                 queued_count = len(to_add)
 
+            self._known_files.update(known)
 
         except Exception as e:
             logger.error(f"Error processing batch: {e}")
@@ -379,21 +520,26 @@ class FolderWatcher:
 
         # Sync from source if enabled and queue is low
         if self.sync_enabled:
-            pending = self.get_pending_count_in_folder()
+            pending = self.get_pending_count_in_folder(limit=self.sync_batch_size)
             if pending < self.sync_batch_size:
                 synced = self.sync_from_source()
                 stats["synced"] = synced
 
-        audio_files = self.scan_folder()
+        audio_files = self.scan_folder_stats()
         stats["scanned"] = len(audio_files)
 
         # Clean stale cache entries
-        current_files = {str(f) for f in audio_files}
+        current_files = {self._cache_key(f) for f, _ in audio_files}
         self.clean_stale_cache(current_files)
 
+        # Periodically look every file up again, known or not
+        self._poll_count += 1
+        if self._poll_count % self.recheck_polls == 0:
+            self._known_files.clear()
+
         ready_files = []
-        for file_path in audio_files:
-            if not self.is_file_ready(file_path):
+        for file_path, file_stat in audio_files:
+            if not self.is_file_ready(file_path, file_stat):
                 continue
 
             stats["ready"] += 1
@@ -409,6 +555,7 @@ class FolderWatcher:
     def start(self) -> None:
         """Start the watcher loop."""
         self._running = True
+        self._stop_event.clear()
         logger.info(f"Starting folder watcher on {self.folder}")
         logger.info(f"Poll interval: {self.poll_interval}s, Stable threshold: {self.stable_seconds}s")
         
@@ -429,11 +576,9 @@ class FolderWatcher:
             except Exception as e:
                 logger.error(f"Error during poll: {e}", exc_info=True)
 
-            # Sleep in small increments to allow quick shutdown
-            for _ in range(self.poll_interval):
-                if not self._running:
-                    break
-                time.sleep(1)
+            # Block until the next poll is due; stop() wakes this immediately
+            if self._stop_event.wait(self.poll_interval):
+                break
 
         logger.info("Folder watcher stopped")
 
@@ -441,6 +586,7 @@ class FolderWatcher:
         """Stop the watcher loop."""
         logger.info("Stopping folder watcher...")
         self._running = False
+        self._stop_event.set()
 
 
 def main() -> None:
@@ -455,6 +601,9 @@ def main() -> None:
         sync_enabled=settings.sync_enabled,
         source_folder=settings.source_dir if settings.sync_enabled else None,
         sync_batch_size=settings.sync_batch_size,
+        hash_workers=settings.watcher_hash_workers,
+        db_batch_size=settings.watcher_db_batch_size,
+        recheck_polls=settings.watcher_recheck_polls,
     )
 
     # Handle shutdown signals
@@ -11,12 +11,13 @@ from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from sqlalchemy.orm import Session
 from celery import Task
 from celery.exceptions import MaxRetriesExceededError, Retry
+from celery.signals import worker_process_init
 
 from app.config import get_settings, Settings
 from app.db.models import Enrichment, Recording, RecordingStatus, Transcript
 from app.db.session import get_sync_session
 from app.processors.analytics import compute_analytics, AnalyticsResult
-from app.processors.diarize import assign_speakers_to_transcript, diarize_audio
+from app.processors.diarize import assign_speakers_to_transcript, diarize_audio, warmup as warmup_diarization
 from app.processors.filename_parser import parse_recording_filename
 from app.processors.metadata import extract_metadata, AudioMetadata
 from app.processors.transcribe import segments_to_json, transcribe_audio, TranscriptionResult, TranscriptSegment
@@ -31,6 +32,19 @@ logger = logging.getLogger("app.worker.tasks")
 settings = get_settings()
 
 
+@worker_process_init.connect
+def _warm_up_models(**kwargs: Any) -> None:
+    """Start warming the diarization pipeline in each new worker process.
+
+    The prefork pool kills a child whose worker_process_init handlers take
+    longer than worker_proc_alive_timeout (4s by default), far less than a
+    pipeline load, so the warmup runs on a daemon thread. A task that arrives
+    first waits for the load, then for the warmup run, instead of running the
+    pipeline alongside it.
+    """
+    threading.Thread(target=warmup_diarization, name="diarization-warmup", daemon=True).start()
+
+
 def trigger_advanced_analytics(recording_id: str | uuid.UUID, session: Session) -> None:
     """Trigger advanced analytics: fingerprint, embeddings, and MV refresh."""
     try:
@@ -1,11 +1,12 @@
 """Shared test fixtures and configuration."""
 
+import functools
 import socket
 import tempfile
 import uuid
 import sys
 import os
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -75,12 +76,35 @@ from app.main import app
 from app.processors.transcribe import TranscriptSegment
 
 
+# ============================================
+# Collection
+# ============================================
+
+# Test directories whose tests create and drop the shared test schema.
+_DB_TEST_DIRS = frozenset({"db", "integration"})
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Pin DB-backed tests to one xdist worker under ``--dist loadgroup``.
+
+    They all build and drop the same schema, so only unit tests may run in
+    parallel with them.
+    """
+    for item in items:
+        if item.path.parent.name in _DB_TEST_DIRS:
+            item.add_marker(pytest.mark.xdist_group(name="db"))
+
+
 # ============================================
 # Test Settings
 # ============================================
 
+@functools.lru_cache(maxsize=1)
 def get_test_settings() -> Settings:
-    """Get test-specific settings."""
+    """Get test-specific settings.
+
+    Cached: callers must not mutate the result; use ``model_copy(update=...)``.
+    """
     if USE_SQLITE:
         # Use in-memory SQLite
         db_url_sync = "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
@@ -102,9 +126,9 @@ def get_test_settings() -> Settings:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_settings() -> Settings:
-    """Provide test settings."""
+    """Provide test settings (shared; copy with ``model_copy`` before changing)."""
     return get_test_settings()
 
 
@@ -113,8 +137,12 @@ def test_settings() -> Settings:
 # ============================================
 
 
+@functools.lru_cache(maxsize=1)
 def _test_db_reachable() -> bool:
-    """Return True if test Postgres (localhost:5433) is reachable within 2s."""
+    """Return True if test Postgres (localhost:5433) is reachable within 2s.
+
+    Cached so the TCP probe runs once per test session, not once per fixture.
+    """
     if USE_SQLITE:
         return True
     try:
@@ -163,6 +191,103 @@ def db_session() -> Generator[Session, None, None]:
     engine.dispose()
 
 
+def _with_dependent_tables(tables: list[sqlalchemy.Table]) -> list[sqlalchemy.Table]:
+    """Return ``tables`` plus every table with a foreign key into them, in dependency order."""
+    names = {table.name for table in tables}
+    for table in Base.metadata.sorted_tables:
+        if any(fk.column.table.name in names for fk in table.foreign_keys):
+            names.add(table.name)
+    return [table for table in Base.metadata.sorted_tables if table.name in names]
+
+
+@pytest.fixture(scope="class")
+def db_tables() -> list[sqlalchemy.Table] | None:
+    """Tables built by ``shared_db_connection``; None means the full schema.
+
+    Override in a test class that only touches a few tables to skip the DDL
+    for the rest.
+    """
+    return None
+
+
+@pytest.fixture(scope="class")
+def shared_db_connection(
+    db_tables: list[sqlalchemy.Table] | None,
+) -> Generator[sqlalchemy.Connection, None, None]:
+    """Provide one connection per test class, inside an outer transaction.
+
+    The schema is built once per class instead of per test; pair with
+    ``savepoint_session_factory`` for per-test isolation.
+    """
+    if not _test_db_reachable():
+        pytest.skip("Test Postgres not reachable at localhost:5433 (start test DB or skip)")
+    settings = get_test_settings()
+
+    connect_args = {}
+    if USE_SQLITE:
+        connect_args = {"check_same_thread": False}
+
+    engine = create_engine(settings.database_url_sync, connect_args=connect_args)
+
+    if USE_SQLITE:
+        # pysqlite defers BEGIN until the first DML, which breaks SAVEPOINT
+        # nesting; take over transaction control so the outer BEGIN is real.
+        @sqlalchemy.event.listens_for(engine, "connect")
+        def _sqlite_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @sqlalchemy.event.listens_for(engine, "begin")
+        def _sqlite_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+    # Dropping a parent table needs its children gone first.
+    drop_tables = _with_dependent_tables(db_tables) if db_tables is not None else None
+    Base.metadata.drop_all(bind=engine, tables=drop_tables)
+    Base.metadata.create_all(bind=engine, tables=db_tables)
+
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    yield connection
+
+    transaction.rollback()
+    connection.close()
+    Base.metadata.drop_all(bind=engine, tables=drop_tables)
+    engine.dispose()
+
+
+@pytest.fixture
+def savepoint_session_factory(
+    shared_db_connection: sqlalchemy.Connection,
+) -> Generator[Callable[[], Session], None, None]:
+    """Provide a session factory whose work is rolled back after each test.
+
+    Sessions join the class connection via SAVEPOINTs, so code under test
+    may commit and close freely; the per-test SAVEPOINT is rolled back on
+    teardown instead of rebuilding the schema. Sessions the test left open
+    are closed first so none still holds a nested transaction at rollback.
+    """
+    savepoint = shared_db_connection.begin_nested()
+    factory = sessionmaker(
+        bind=shared_db_connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+        autoflush=False,
+    )
+    sessions: list[Session] = []
+
+    def make_session() -> Session:
+        session = factory()
+        sessions.append(session)
+        return session
+
+    yield make_session
+    for session in sessions:
+        session.close()
+    if savepoint.is_active:
+        savepoint.rollback()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_engine():
     """Create async database engine for tests."""
@@ -289,9 +414,9 @@ def processed_recording(db_session: Session) -> Recording:
     return recording
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_segments() -> list[TranscriptSegment]:
-    """Provide sample transcript segments for testing."""
+    """Provide sample transcript segments for testing (shared; do not mutate)."""
     return [
         TranscriptSegment(start=0.0, end=2.5, text="Hello world", speaker="SPEAKER_0"),
         TranscriptSegment(start=3.0, end=5.0, text="Testing one two", speaker="SPEAKER_1"),
@@ -365,15 +490,34 @@ def test_client() -> Generator[TestClient, None, None]:
     app.dependency_overrides.clear()
 
 
-@pytest.fixture
-def auth_headers() -> dict[str, str]:
-    """Provide authentication headers."""
-    return {"Authorization": "Bearer test-token"}
+@pytest.fixture(scope="session")
+def auth_headers(test_settings: Settings) -> dict[str, str]:
+    """Provide authentication headers for the test API token."""
+    return {"Authorization": f"Bearer {test_settings.api_token}"}
+
+
+@pytest.fixture(autouse=True)
+def _reset_dependency_overrides() -> Generator[None, None, None]:
+    """Clear FastAPI dependency overrides after every test."""
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def shared_async_client() -> AsyncGenerator[AsyncClient, None]:
+    """Provide one ASGI-backed async client for the whole test session."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        yield client
 
 
 @pytest_asyncio.fixture
-async def async_client(async_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Provide an async test client."""
+async def async_client(
+    shared_async_client: AsyncClient, async_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Provide the shared async test client wired to this test's database session."""
     from app.db.session import get_async_session
 
     async def override_get_session():
@@ -382,13 +526,7 @@ async def async_client(async_session: AsyncSession) -> AsyncGenerator[AsyncClien
     app.dependency_overrides[get_settings] = get_test_settings
     app.dependency_overrides[get_async_session] = override_get_session
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-    ) as client:
-        yield client
-
-    app.dependency_overrides.clear()
+    yield shared_async_client
 
 
 # ============================================
@@ -2,55 +2,48 @@
 import uuid
 from unittest.mock import patch, MagicMock
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import insert, select
 
-from tests.conftest import _test_db_reachable, get_test_settings, USE_SQLITE
-from app.db.models import Base, Recording, RecordingStatus
+from tests.conftest import get_test_settings
+from app.db.models import Recording, RecordingStatus
 from app.worker.tasks import enqueue_pending_recordings
 
 pytestmark = pytest.mark.integration
 
 class TestEnqueueLogic:
-    @pytest.fixture
-    def db_engine(self):
-        if not _test_db_reachable():
-            pytest.skip("Test Postgres not reachable")
-        settings = get_test_settings()
-        connect_args = {"check_same_thread": False} if USE_SQLITE else {}
-        engine = create_engine(settings.database_url_sync, connect_args=connect_args)
-        Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
-        yield engine
-        Base.metadata.drop_all(bind=engine)
-        engine.dispose()
+    @pytest.fixture(scope="class")
+    @classmethod
+    def db_tables(cls):
+        """Enqueueing only reads and updates recordings."""
+        return [Recording.__table__]
 
     @pytest.fixture
-    def session_factory(self, db_engine):
-        return sessionmaker(bind=db_engine)
+    def shared_session(self, savepoint_session_factory):
+        """One Session handed out for every get_sync_session() call in a test."""
+        session = savepoint_session_factory()
+        yield session
+        session.close()
 
-    def test_enqueue_recordings_batches_updates(self, session_factory):
+    def test_enqueue_recordings_batches_updates(self, shared_session):
         """Test that QUEUED recordings are updated to PROCESSING and tasks are dispatched."""
-        # Create 3 queued recordings
-        session = session_factory()
-        recordings = []
-        for i in range(3):
-            rec = Recording(
-                id=uuid.uuid4(),
-                file_path=f"/tmp/test_{i}.m4a",
-                file_name=f"test_{i}.m4a",
-                file_hash=f"hash_{i}",
-                file_size=1000,
-                status=RecordingStatus.QUEUED,
-            )
-            recordings.append(rec)
-            session.add(rec)
-        session.commit()
-        ids = [str(r.id) for r in recordings]
-        session.close()
+        # Create 3 queued recordings in one multi-row INSERT
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "file_path": f"/tmp/test_{i}.m4a",
+                "file_name": f"test_{i}.m4a",
+                "file_hash": f"hash_{i}",
+                "file_size": 1000,
+                "status": RecordingStatus.QUEUED,
+            }
+            for i in range(3)
+        ]
+        shared_session.execute(insert(Recording), rows)
+        shared_session.commit()
+        ids = [str(r["id"]) for r in rows]
 
         # Mock dependencies
-        with patch("app.worker.tasks.get_sync_session", lambda: session_factory()), \
+        with patch("app.worker.tasks.get_sync_session", lambda: shared_session), \
              patch("app.worker.tasks.process_recording.delay") as mock_delay, \
              patch("app.worker.tasks.get_settings") as mock_settings:
 
@@ -67,16 +60,16 @@ class TestEnqueueLogic:
             called_ids = [call.args[0] for call in mock_delay.call_args_list]
             assert set(called_ids) == set(ids)
 
-            # Verify DB state
-            verify_session = session_factory()
-            for r_id in ids:
-                rec = verify_session.query(Recording).filter(Recording.id == uuid.UUID(r_id)).first()
-                assert rec.status == RecordingStatus.PROCESSING
-            verify_session.close()
+            # Verify DB state in one round-trip
+            recs = shared_session.scalars(
+                select(Recording).where(Recording.id.in_([r["id"] for r in rows]))
+            ).all()
+            assert len(recs) == len(ids)
+            assert all(rec.status == RecordingStatus.PROCESSING for rec in recs)
 
-    def test_enqueue_handles_empty_queue(self, session_factory):
+    def test_enqueue_handles_empty_queue(self, shared_session):
         """Test that nothing happens when queue is empty."""
-        with patch("app.worker.tasks.get_sync_session", lambda: session_factory()), \
+        with patch("app.worker.tasks.get_sync_session", lambda: shared_session), \
              patch("app.worker.tasks.process_recording.delay") as mock_delay, \
              patch("app.worker.tasks.get_settings") as mock_settings:
 
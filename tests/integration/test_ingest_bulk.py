@@ -1,28 +1,30 @@
 import pytest
-import tempfile
 from pathlib import Path
-from sqlalchemy import select, func
+from pyfakefs.fake_filesystem_unittest import Patcher
+from sqlalchemy import select, update
+from app.config import get_settings
 from app.db.models import Recording, RecordingStatus
+from app.main import app
+from tests.conftest import get_test_settings
 
-@pytest.mark.asyncio
-async def test_ingest_bulk_behavior(async_client, auth_headers, async_session, fixtures_dir):
-    """Test bulk ingest behavior with mixed new, existing, and failed files."""
+# Ingest folder inside the in-memory filesystem; never touches disk
+_FAKE_CALLS_DIR = Path("/calls")
 
-    with tempfile.TemporaryDirectory(dir=fixtures_dir) as tmpdir:
-        tmp_path = Path(tmpdir)
 
-        # Create 20 files
-        for i in range(20):
-            (tmp_path / f"call_{i}.mp3").write_text(f"content_{i}")
+@pytest.mark.asyncio
+async def test_ingest_bulk_behavior(async_client, auth_headers, async_session):
+    """Test bulk ingest behavior with mixed new, existing, and failed files."""
 
-        # 1. Ingest first 10
-        # Clean start
-        for f in tmp_path.glob("*.mp3"):
-            f.unlink()
+    with Patcher() as patcher:
+        fs = patcher.fs
+        tmp_path = _FAKE_CALLS_DIR
+        fs.create_dir(tmp_path)
+        settings = get_test_settings().model_copy(update={"calls_dir": str(tmp_path)})
+        app.dependency_overrides[get_settings] = lambda: settings
 
         # Batch 1: Files 0-9
         for i in range(10):
-            (tmp_path / f"call_{i}.mp3").write_text(f"content_{i}")
+            fs.create_file(tmp_path / f"call_{i}.mp3", contents=f"content_{i}")
 
         resp1 = await async_client.post(
             "/api/v1/ingest",
@@ -35,22 +37,24 @@ async def test_ingest_bulk_behavior(async_client, auth_headers, async_session, f
         assert data1["queued"] == 10
         assert data1["skipped"] == 0
 
-        # Verify DB
-        count = await async_session.scalar(select(func.count(Recording.id)))
-        assert count == 10
+        # Verify DB holds exactly the first batch
+        names = (await async_session.scalars(select(Recording.file_name))).all()
+        assert sorted(names) == sorted(f"call_{i}.mp3" for i in range(10))
 
         # Batch 2: Files 0-9 (existing) + 10-19 (new) + Duplicate content file
         for i in range(10, 20):
-            (tmp_path / f"call_{i}.mp3").write_text(f"content_{i}")
+            fs.create_file(tmp_path / f"call_{i}.mp3", contents=f"content_{i}")
 
         # Modify file 0 to be FAILED
-        result = await async_session.execute(select(Recording).where(Recording.file_name == "call_0.mp3"))
-        rec0 = result.scalar_one()
-        rec0.status = RecordingStatus.FAILED
+        await async_session.execute(
+            update(Recording)
+            .where(Recording.file_name == "call_0.mp3")
+            .values(status=RecordingStatus.FAILED)
+        )
         await async_session.commit()
 
         # Add a duplicate file (same content as call_15.mp3)
-        (tmp_path / "call_15_duplicate.mp3").write_text("content_15")
+        fs.create_file(tmp_path / "call_15_duplicate.mp3", contents="content_15")
 
         resp2 = await async_client.post(
             "/api/v1/ingest",
@@ -77,6 +81,6 @@ async def test_ingest_bulk_behavior(async_client, auth_headers, async_session, f
         assert data2["queued"] == 11
         assert data2["skipped"] == 10
 
-        # Verify DB count: should be 20 unique recordings (hashes)
-        count = await async_session.scalar(select(func.count(Recording.id)))
-        assert count == 20
+        # Verify DB: 20 unique recordings (hashes); the duplicate was not stored
+        names = (await async_session.scalars(select(Recording.file_name))).all()
+        assert sorted(names) == sorted(f"call_{i}.mp3" for i in range(20))
@@ -11,10 +11,9 @@ async def test_queue_status_unauthenticated(async_client: AsyncClient):
     # AFTER FIX: This should fail (401 Unauthorized)
     assert response.status_code == 401
 
-async def test_queue_status_authenticated(async_client: AsyncClient, test_settings):
+async def test_queue_status_authenticated(async_client: AsyncClient, auth_headers):
     """Test that queue status is accessible with authentication."""
-    headers = {"Authorization": f"Bearer {test_settings.api_token}"}
-    response = await async_client.get("/api/v1/queue/status", headers=headers)
+    response = await async_client.get("/api/v1/queue/status", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
     assert "queued" in data
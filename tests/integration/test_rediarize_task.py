@@ -44,7 +44,7 @@ class TestRediarizeTask:
 
     @pytest.fixture
     def task_session_factory(self, task_db_engine):
-        return sessionmaker(bind=task_db_engine)
+        return sessionmaker(bind=task_db_engine, autoflush=False)
 
     @pytest.fixture
     def mock_processors(self):
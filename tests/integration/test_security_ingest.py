@@ -7,7 +7,7 @@ from httpx import AsyncClient
 from app.config import Settings
 
 @pytest.mark.asyncio
-async def test_ingest_path_traversal_reproduction(async_client: AsyncClient):
+async def test_ingest_path_traversal_reproduction(async_client: AsyncClient, auth_headers):
     """
     Test to reproduce the path traversal vulnerability.
     We create a temporary directory outside the allowed 'calls_dir'
@@ -27,7 +27,7 @@ async def test_ingest_path_traversal_reproduction(async_client: AsyncClient):
         response = await async_client.post(
             "/api/v1/ingest",
             json={"folder": str(temp_path), "force_reprocess": True},
-            headers={"Authorization": "Bearer test-token"}
+            headers=auth_headers
         )
 
         assert response.status_code == 403, f"Fix failed: External folder was not blocked. Status: {response.status_code}"
@@ -35,7 +35,7 @@ async def test_ingest_path_traversal_reproduction(async_client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_ingest_valid_path(async_client: AsyncClient, test_settings: Settings):
+async def test_ingest_valid_path(async_client: AsyncClient, test_settings: Settings, auth_headers):
     """
     Test that ingesting a valid subdirectory works.
     """
@@ -57,7 +57,7 @@ async def test_ingest_valid_path(async_client: AsyncClient, test_settings: Setti
         response = await async_client.post(
             "/api/v1/ingest",
             json={"folder": str(sub_dir), "force_reprocess": True},
-            headers={"Authorization": "Bearer test-token"}
+            headers=auth_headers
         )
 
         # It should succeed (200)
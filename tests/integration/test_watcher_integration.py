@@ -1,5 +1,6 @@
 """Integration tests for the folder watcher service."""
 
+import functools
 import os
 import time
 from pathlib import Path
@@ -9,6 +10,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.db.models import Recording, RecordingStatus
+from app.processors.metadata import compute_file_hash
 from app.watcher.folder_watcher import FolderWatcher
 
 
@@ -30,49 +32,81 @@ def watcher(watch_folder: Path) -> FolderWatcher:
     )
 
 
+def write_with_mtime(file_path: Path, content: bytes, mtime: float) -> None:
+    """Write content and set atime/mtime through the same open fd."""
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content)
+        os.utime(fd, times=(mtime, mtime))
+    finally:
+        os.close(fd)
+
+
 def create_stable_file(folder: Path, name: str, content: bytes = b"test audio data") -> Path:
     """Create a file that appears stable (old mtime)."""
     file_path = folder / name
-    file_path.write_bytes(content)
     # Set mtime to 60 seconds ago
-    old_mtime = time.time() - 60
-    os.utime(file_path, (old_mtime, old_mtime))
+    write_with_mtime(file_path, content, time.time() - 60)
     return file_path
 
 
+@pytest.fixture
+def mock_not_in_db_session() -> MagicMock:
+    """Session mock whose lookups find no existing recordings."""
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = None
+    session.query.return_value.filter.return_value.all.return_value = []
+    return session
+
+
+def _hash_by_name(path: str) -> str:
+    """compute_file_hash stand-in: a distinct hash per file name."""
+    return f"hash_{Path(path).name}"
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_file_hash(path: str) -> str:
+    """Real compute_file_hash, memoized by path; tests write each file once."""
+    return compute_file_hash(path)
+
+
 class TestWatcherProcessesStableFile:
-    """End-to-end test: file added, detected, queued."""
+    """End-to-end test: files added, detected, queued (single and concurrent)."""
 
+    @pytest.mark.parametrize(
+        "names",
+        [["test_audio.m4a"], ["audio1.m4a", "audio2.mp3", "audio3.wav"]],
+        ids=["single", "multiple"],
+    )
     @patch("app.watcher.folder_watcher.SyncSessionLocal")
     @patch("app.watcher.folder_watcher.compute_file_hash")
-    def test_stable_file_gets_queued(
+    def test_stable_files_get_queued(
         self,
         mock_hash: MagicMock,
         mock_session_class: MagicMock,
+        names: list[str],
         watch_folder: Path,
         watcher: FolderWatcher,
+        mock_not_in_db_session: MagicMock,
     ) -> None:
-        """A stable file is detected and a record is queued (periodic enqueue_pending_recordings will enqueue)."""
-        # Create a stable file
-        test_file = create_stable_file(watch_folder, "test_audio.m4a")
+        """Stable files are detected and records queued (periodic enqueue_pending_recordings will enqueue)."""
+        for name in names:
+            create_stable_file(watch_folder, name)
 
-        mock_hash.return_value = "stable_hash_123"
+        mock_hash.side_effect = _hash_by_name
 
-        # Mock session - file not in DB
-        mock_session = MagicMock()
-        mock_session.query.return_value.filter.return_value.first.return_value = None
-        mock_session_class.return_value = mock_session
+        mock_session_class.return_value = mock_not_in_db_session
 
-        # First poll - records size but not ready yet
+        # First poll - records sizes but not ready yet
         stats1 = watcher.poll_once()
-        assert stats1["scanned"] == 1
+        assert stats1["scanned"] == len(names)
         assert stats1["queued"] == 0
 
-        # Second poll - file is now ready, record created with QUEUED
+        # Second poll - files are now ready, records created with QUEUED
         stats2 = watcher.poll_once()
-        assert stats2["scanned"] == 1
-        assert stats2["ready"] == 1
-        assert stats2["queued"] == 1
+        assert stats2["scanned"] == len(names)
+        assert stats2["ready"] == len(names)
+        assert stats2["queued"] == len(names)
 
 
 class TestWatcherWaitsForStability:
@@ -85,17 +119,15 @@ class TestWatcherWaitsForStability:
     ) -> None:
         """A file whose size keeps changing is not processed."""
         test_file = watch_folder / "changing.m4a"
-        test_file.write_bytes(b"initial")
         old_mtime = time.time() - 60
-        os.utime(test_file, (old_mtime, old_mtime))
+        write_with_mtime(test_file, b"initial", old_mtime)
 
         # First poll
         stats1 = watcher.poll_once()
         assert stats1["ready"] == 0
 
         # Change the file
-        test_file.write_bytes(b"more content added")
-        os.utime(test_file, (old_mtime, old_mtime))
+        write_with_mtime(test_file, b"more content added", old_mtime)
 
         # Second poll - size changed, still not ready
         stats2 = watcher.poll_once()
@@ -126,80 +158,43 @@ class TestWatcherWaitsForStability:
         assert stats2["ready"] == 0
 
 
-class TestWatcherHandlesConcurrentFiles:
-    """Multiple files queued correctly."""
-
-    @patch("app.watcher.folder_watcher.SyncSessionLocal")
-    @patch("app.watcher.folder_watcher.compute_file_hash")
-    def test_multiple_files_processed(
-        self,
-        mock_hash: MagicMock,
-        mock_session_class: MagicMock,
-        watch_folder: Path,
-        watcher: FolderWatcher,
-    ) -> None:
-        """Multiple stable files are all queued (periodic enqueue_pending_recordings will enqueue)."""
-        # Create multiple stable files
-        create_stable_file(watch_folder, "audio1.m4a")
-        create_stable_file(watch_folder, "audio2.mp3")
-        create_stable_file(watch_folder, "audio3.wav")
-
-        # Return different hashes for each file
-        hash_counter = [0]
-
-        def hash_side_effect(path: str) -> str:
-            hash_counter[0] += 1
-            return f"hash_{hash_counter[0]}"
-
-        mock_hash.side_effect = hash_side_effect
-
-        # Mock session - files not in DB
-        mock_session = MagicMock()
-        mock_session.query.return_value.filter.return_value.first.return_value = None
-        mock_session_class.return_value = mock_session
-
-        # First poll - records sizes
-        stats1 = watcher.poll_once()
-        assert stats1["scanned"] == 3
-        assert stats1["queued"] == 0
-
-        # Second poll - all files ready, three records created with QUEUED
-        stats2 = watcher.poll_once()
-        assert stats2["scanned"] == 3
-        assert stats2["ready"] == 3
-        assert stats2["queued"] == 3
-
-
 class TestWatcherWithDatabase:
     """Integration tests with actual database."""
 
+    @pytest.fixture(scope="class")
+    @classmethod
+    def db_tables(cls):
+        """The watcher only inserts and looks up recordings."""
+        return [Recording.__table__]
+
+    @pytest.fixture(autouse=True)
+    def _cached_hashing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Hash each fixture file once across the test's own lookup and the polls."""
+        monkeypatch.setattr("app.watcher.folder_watcher.compute_file_hash", _cached_file_hash)
+
     @pytest.fixture
     def watcher_with_db(
-        self, watch_folder: Path, db_session: Session
+        self, watch_folder: Path, savepoint_session_factory
     ) -> tuple[FolderWatcher, Session]:
-        """Create watcher with real database session."""
+        """Create watcher with a real database session rolled back after each test."""
         watcher = FolderWatcher(
             folder=watch_folder,
             poll_interval=1,
             stable_seconds=1,
         )
-        return watcher, db_session
+        return watcher, savepoint_session_factory()
 
     def test_creates_recording_in_database(
         self,
         watch_folder: Path,
-        db_session: Session,
+        watcher_with_db: tuple[FolderWatcher, Session],
     ) -> None:
         """New file creates recording in database."""
+        watcher, db_session = watcher_with_db
+
         # Create stable file
         test_file = create_stable_file(watch_folder, "db_test.m4a", b"test audio content")
 
-        watcher = FolderWatcher(
-            folder=watch_folder,
-            poll_interval=1,
-            stable_seconds=1,
-        )
-
         # Patch to use our test session
         with patch("app.watcher.folder_watcher.SyncSessionLocal") as mock_session_class:
             mock_session_class.return_value = db_session
@@ -225,15 +220,15 @@ class TestWatcherWithDatabase:
     def test_skips_already_processed_file(
         self,
         watch_folder: Path,
-        db_session: Session,
+        watcher_with_db: tuple[FolderWatcher, Session],
     ) -> None:
         """File already in DB is not queued again."""
+        watcher, db_session = watcher_with_db
+
         # Create and add file to DB first
         test_file = create_stable_file(watch_folder, "existing.m4a", b"existing content")
 
-        from app.processors.metadata import compute_file_hash
-
-        file_hash = compute_file_hash(str(test_file))
+        file_hash = _cached_file_hash(str(test_file))
 
         existing_recording = Recording(
             file_path=str(test_file),
@@ -245,12 +240,6 @@ class TestWatcherWithDatabase:
         db_session.add(existing_recording)
         db_session.commit()
 
-        watcher = FolderWatcher(
-            folder=watch_folder,
-            poll_interval=1,
-            stable_seconds=1,
-        )
-
         with patch("app.watcher.folder_watcher.SyncSessionLocal") as mock_session_class:
             mock_session_class.return_value = db_session
 
@@ -262,4 +251,3 @@ class TestWatcherWithDatabase:
             assert stats["ready"] == 1
             assert stats["skipped"] == 1
             assert stats["queued"] == 0
-
@@ -1,7 +1,13 @@
 """Unit tests for the diarization processor."""
 
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from app.processors.diarize import (
     diarize_audio,
     assign_speakers_to_transcript,
@@ -10,6 +16,23 @@ from app.processors.diarize import (
 )
 from app.processors.transcribe import TranscriptSegment
 
+# Stand-in for pyannote's Segment: itertracks() only needs .start/.end
+Turn = namedtuple("Turn", ["start", "end"])
+
+
+def _brute_force_speakers(t_segs, d_segs):
+    """Reference max-overlap assignment over every (transcript, turn) pair."""
+    speakers = []
+    for tseg in t_segs:
+        best_speaker, best_overlap = None, 0.0
+        for dseg in sorted(d_segs, key=lambda d: (d.start, d.end)):
+            overlap = min(tseg.end, dseg.end) - max(tseg.start, dseg.start)
+            if overlap > best_overlap:
+                best_speaker, best_overlap = dseg.speaker, overlap
+        speakers.append(best_speaker)
+    return speakers
+
+
 class TestAssignSpeakersToTranscript:
     """Tests for assign_speakers_to_transcript function."""
 
@@ -65,6 +88,54 @@ class TestAssignSpeakersToTranscript:
 
         assert result[0].speaker is None
 
+    def test_assigns_speakers_correctly_large_input(self):
+        """Test the sliding window matches a brute-force max-overlap search."""
+        t_segs = [
+            TranscriptSegment(start=i * 1.5, end=i * 1.5 + 2.0, text=f"seg {i}")
+            for i in range(100)
+        ]
+        d_segs = [
+            DiarizationSegment(start=i * 3.0, end=i * 3.0 + 3.5, speaker=f"SPEAKER_{i % 3}")
+            for i in range(50)
+        ]
+        diarization = DiarizationResult(segments=d_segs, speaker_count=3, speakers=[])
+
+        result = assign_speakers_to_transcript(t_segs, diarization)
+
+        assert [r.speaker for r in result] == _brute_force_speakers(t_segs, d_segs)
+
+    def test_long_turn_with_many_short_turns(self):
+        """Test assignment when one long turn overlaps many short ones."""
+        t_segs = [
+            TranscriptSegment(start=i * 0.5, end=i * 0.5 + 1.0, text=f"seg {i}")
+            for i in range(200)
+        ]
+        d_segs = [DiarizationSegment(start=0.0, end=100.0, speaker="SPEAKER_LONG")] + [
+            DiarizationSegment(start=i * 0.4, end=i * 0.4 + 1.2, speaker=f"SPEAKER_{i % 4}")
+            for i in range(250)
+        ]
+        diarization = DiarizationResult(segments=d_segs, speaker_count=5, speakers=[])
+
+        result = assign_speakers_to_transcript(t_segs, diarization)
+
+        assert [r.speaker for r in result] == _brute_force_speakers(t_segs, d_segs)
+
+    def test_sorts_unordered_diarization(self):
+        """Test that turns out of start order are still matched."""
+        t_segs = [
+            TranscriptSegment(start=0.0, end=1.0, text="Hello"),
+            TranscriptSegment(start=4.0, end=5.0, text="World"),
+        ]
+        d_segs = [
+            DiarizationSegment(start=4.0, end=6.0, speaker="SPEAKER_2"),
+            DiarizationSegment(start=0.0, end=2.0, speaker="SPEAKER_1"),
+        ]
+        diarization = DiarizationResult(segments=d_segs, speaker_count=2, speakers=[])
+
+        result = assign_speakers_to_transcript(t_segs, diarization)
+
+        assert [r.speaker for r in result] == ["SPEAKER_1", "SPEAKER_2"]
+
     def test_handles_empty_diarization(self):
         """Test handling of empty diarization result."""
         t_segs = [TranscriptSegment(start=0.0, end=1.0, text="Hello")]
@@ -76,40 +147,75 @@ class TestAssignSpeakersToTranscript:
         assert result[0].speaker is None
 
 
-class TestDiarizeAudio:
-    """Tests for diarize_audio function."""
+class TestDiarizationResult:
+    """Tests for the DiarizationResult dataclass."""
 
-    @patch("app.processors.diarize.get_or_load_pipeline")
-    @patch("app.processors.diarize._load_audio_as_waveform")
-    def test_diarize_calls_pipeline_with_num_speakers(self, mock_load_audio, mock_get_pipeline, test_settings):
-        """Test that num_speakers is passed to the pipeline."""
-        mock_pipeline = MagicMock()
-        mock_get_pipeline.return_value = mock_pipeline
+    def test_sorts_segments_on_construction(self):
+        """Test that shuffled turns come out in (start, end) order."""
+        d_segs = [
+            DiarizationSegment(start=5.0, end=6.0, speaker="SPEAKER_2"),
+            DiarizationSegment(start=0.0, end=3.0, speaker="SPEAKER_1"),
+            DiarizationSegment(start=0.0, end=2.0, speaker="SPEAKER_2"),
+        ]
 
-        # Mock waveform load
-        mock_waveform = MagicMock()
-        mock_waveform.shape = (1, 16000)
-        mock_load_audio.return_value = (mock_waveform, 16000)
+        result = DiarizationResult(segments=d_segs, speaker_count=2, speakers=[])
 
-        # Mock output
-        mock_annotation = MagicMock()
-        mock_annotation.itertracks.return_value = iter([]) # Empty iterator
+        assert [(d.start, d.end) for d in result.segments] == [(0.0, 2.0), (0.0, 3.0), (5.0, 6.0)]
 
-        # Handle the hasattr check in diarize_audio
-        # If pipeline returns an object with speaker_diarization attr, it uses that.
-        # Otherwise it uses the object directly.
-        # We'll make it return the annotation directly to simplify.
-        mock_pipeline.return_value = mock_annotation
+    def test_keeps_sorted_list(self):
+        """Test that already ordered turns are used as given."""
+        d_segs = [
+            DiarizationSegment(start=0.0, end=1.0, speaker="SPEAKER_1"),
+            DiarizationSegment(start=1.0, end=2.0, speaker="SPEAKER_2"),
+        ]
+
+        result = DiarizationResult(segments=d_segs, speaker_count=2, speakers=[])
+
+        assert result.segments is d_segs
 
-        with patch("app.processors.diarize.get_settings", return_value=test_settings):
-            # Enable diarization in settings
-            test_settings.diarization_enabled = True
 
-            diarize_audio("/path/to/audio.wav", num_speakers=2)
+def _annotation(tracks=()):
+    """pyannote 3.x-style output: an object with itertracks()."""
+    return SimpleNamespace(itertracks=lambda yield_label: iter(tracks))
+
+
+@pytest.fixture
+def diarization_env(test_settings):
+    """Enabled diarization over a 1s waveform, with torch and the pipeline stubbed.
+
+    Yields a namespace with the ``pipeline`` mock (returns an empty
+    annotation by default), ``get_pipeline``, ``load_audio``,
+    ``get_settings`` and ``torch``.
+    """
+    mock_waveform = MagicMock()
+    mock_waveform.shape = (1, 16000)
+    # Enable diarization on a copy; test_settings is shared across the session
+    settings = test_settings.model_copy(update={"diarization_enabled": True})
+    mock_pipeline = MagicMock(return_value=_annotation())
+
+    with patch("app.processors.diarize.torch") as mock_torch, \
+         patch("app.processors.diarize.get_or_load_pipeline", return_value=mock_pipeline) as mock_get_pipeline, \
+         patch("app.processors.diarize._load_audio_as_waveform", return_value=(mock_waveform, 16000)) as mock_load_audio, \
+         patch("app.processors.diarize.get_settings", return_value=settings) as mock_get_settings:
+        yield SimpleNamespace(
+            load_audio=mock_load_audio,
+            pipeline=mock_pipeline,
+            get_pipeline=mock_get_pipeline,
+            get_settings=mock_get_settings,
+            torch=mock_torch,
+        )
+
+
+class TestDiarizeAudio:
+    """Tests for diarize_audio function."""
+
+    def test_diarize_calls_pipeline_with_num_speakers(self, diarization_env):
+        """Test that num_speakers is passed to the pipeline."""
+        diarize_audio("/path/to/audio.wav", num_speakers=2)
 
         # Verify pipeline call
-        mock_pipeline.assert_called_once()
-        call_args, call_kwargs = mock_pipeline.call_args
+        diarization_env.pipeline.assert_called_once()
+        call_args, call_kwargs = diarization_env.pipeline.call_args
 
         # Check that waveform dict was passed
         assert "waveform" in call_args[0]
@@ -117,25 +223,148 @@ class TestDiarizeAudio:
         # Check that num_speakers was passed in kwargs
         assert call_kwargs["num_speakers"] == 2
 
-    @patch("app.processors.diarize.get_or_load_pipeline")
-    @patch("app.processors.diarize._load_audio_as_waveform")
-    def test_diarize_without_num_speakers(self, mock_load_audio, mock_get_pipeline, test_settings):
+    def test_diarize_without_num_speakers(self, diarization_env):
         """Test that num_speakers is not passed if None."""
-        mock_pipeline = MagicMock()
-        mock_get_pipeline.return_value = mock_pipeline
+        diarize_audio("/path/to/audio.wav")
 
-        mock_waveform = MagicMock()
-        mock_waveform.shape = (1, 16000)
-        mock_load_audio.return_value = (mock_waveform, 16000)
+        diarization_env.pipeline.assert_called_once()
+        _, call_kwargs = diarization_env.pipeline.call_args
+        assert "num_speakers" not in call_kwargs
 
-        mock_annotation = MagicMock()
-        mock_annotation.itertracks.return_value = iter([])
-        mock_pipeline.return_value = mock_annotation
+    @pytest.mark.parametrize("wrapped", [False, True], ids=["pyannote3", "pyannote4"])
+    def test_converts_tracks_to_segments(self, diarization_env, wrapped):
+        """Test that itertracks output becomes segments and sorted speakers."""
+        annotation = _annotation([
+            (Turn(0.0, 5.0), "A", "SPEAKER_1"),
+            (Turn(5.0, 8.0), "B", "SPEAKER_0"),
+            (Turn(8.0, 9.5), "C", "SPEAKER_1"),
+        ])
+        diarization_env.pipeline.return_value = (
+            SimpleNamespace(speaker_diarization=annotation) if wrapped else annotation
+        )
 
-        with patch("app.processors.diarize.get_settings", return_value=test_settings):
-            test_settings.diarization_enabled = True
-            diarize_audio("/path/to/audio.wav")
+        result = diarize_audio("/path/to/audio.wav")
 
-        mock_pipeline.assert_called_once()
-        _, call_kwargs = mock_pipeline.call_args
-        assert "num_speakers" not in call_kwargs
+        assert [(d.start, d.end, d.speaker) for d in result.segments] == [
+            (0.0, 5.0, "SPEAKER_1"),
+            (5.0, 8.0, "SPEAKER_0"),
+            (8.0, 9.5, "SPEAKER_1"),
+        ]
+        assert result.speakers == ["SPEAKER_0", "SPEAKER_1"]
+        assert result.speaker_count == 2
+
+    def test_pipeline_runs_in_inference_mode_on_configured_device(self, diarization_env):
+        """Test that the pipeline call happens inside torch.inference_mode()."""
+        events = []
+        inference_mode = diarization_env.torch.inference_mode.return_value
+        inference_mode.__enter__.side_effect = lambda: events.append("enter")
+        inference_mode.__exit__.side_effect = lambda *exc: events.append("exit")
+        diarization_env.pipeline.side_effect = lambda *args, **kwargs: events.append("pipeline") or _annotation()
+
+        settings = diarization_env.get_settings.return_value
+        diarization_env.get_settings.return_value = settings.model_copy(
+            update={"diarization_device": "cuda"}
+        )
+
+        diarize_audio("/path/to/audio.wav")
+
+        assert events == ["enter", "pipeline", "exit"]
+        diarization_env.get_pipeline.assert_called_once_with(device="cuda")
+
+
+class TestWarmup:
+    """Tests for the diarization warmup."""
+
+    def test_runs_pipeline_once_on_one_second_of_silence(self, diarization_env):
+        """Test that warmup loads the pipeline and calls it once with 1s of audio."""
+        from app.processors.diarize import warmup
+
+        warmup()
+
+        diarization_env.torch.zeros.assert_called_once_with(1, 16000)
+        diarization_env.pipeline.assert_called_once_with(
+            {"waveform": diarization_env.torch.zeros.return_value, "sample_rate": 16000}
+        )
+
+    def test_skipped_when_diarization_disabled(self, diarization_env):
+        """Test that nothing is loaded when diarization is disabled."""
+        from app.processors.diarize import warmup
+
+        settings = diarization_env.get_settings.return_value
+        diarization_env.get_settings.return_value = settings.model_copy(
+            update={"diarization_enabled": False}
+        )
+
+        warmup()
+
+        diarization_env.get_pipeline.assert_not_called()
+
+    def test_load_failure_is_logged_not_raised(self, diarization_env):
+        """Test that a failing load does not stop worker startup."""
+        from app.processors.diarize import warmup
+
+        diarization_env.get_pipeline.side_effect = ImportError("no pyannote")
+
+        warmup()
+
+    def test_waits_for_a_running_diarization(self, diarization_env):
+        """Test that warmup never runs the pipeline alongside a task's call."""
+        from app.processors.diarize import _pipeline_run_lock, warmup
+
+        with _pipeline_run_lock:
+            thread = threading.Thread(target=warmup)
+            thread.start()
+            thread.join(timeout=0.1)
+            assert thread.is_alive()
+            diarization_env.pipeline.assert_not_called()
+
+        thread.join(timeout=5)
+        diarization_env.pipeline.assert_called_once()
+
+
+class TestGetOrLoadPipeline:
+    """Tests for diarization pipeline loading and caching."""
+
+    def test_caches_pipeline(self, test_settings):
+        """Test that the pipeline is loaded once and reused."""
+        from app.processors.diarize import _pipeline_cache, get_or_load_pipeline
+        _pipeline_cache.clear()
+
+        with patch("app.processors.diarize.Pipeline") as mock_pipeline_class, \
+             patch("app.processors.diarize.torch"), \
+             patch("app.processors.diarize.HAS_DIARIZE_DEPS", True), \
+             patch("app.processors.diarize.get_settings", return_value=test_settings):
+            pipeline1 = get_or_load_pipeline()
+            pipeline2 = get_or_load_pipeline()
+
+        assert pipeline1 is pipeline2
+        mock_pipeline_class.from_pretrained.assert_called_once_with("pyannote/speaker-diarization-3.1")
+        _pipeline_cache.clear()
+
+    def test_concurrent_first_calls_load_once(self, test_settings):
+        """Test that threads racing on an empty cache share one load."""
+        from app.processors.diarize import _pipeline_cache, get_or_load_pipeline
+        _pipeline_cache.clear()
+
+        def slow_load(model_name):
+            time.sleep(0.05)
+            return MagicMock()
+
+        with patch("app.processors.diarize.Pipeline") as mock_pipeline_class, \
+             patch("app.processors.diarize.torch"), \
+             patch("app.processors.diarize.HAS_DIARIZE_DEPS", True), \
+             patch("app.processors.diarize.get_settings", return_value=test_settings):
+            mock_pipeline_class.from_pretrained.side_effect = slow_load
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(get_or_load_pipeline()))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_pipeline_class.from_pretrained.call_count == 1
+        assert all(result is results[0] for result in results)
+        _pipeline_cache.clear()
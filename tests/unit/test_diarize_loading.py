@@ -39,7 +39,7 @@ for mod_name, mock_obj in mock_modules.items():
 import importlib
 import app.processors.diarize
 importlib.reload(app.processors.diarize)
-from app.processors.diarize import _load_audio_as_waveform
+from app.processors.diarize import _load_audio_as_waveform, _resampler_cache
 
 
 class TestLoadAudioAsWaveform:
@@ -58,7 +58,7 @@ class TestLoadAudioAsWaveform:
             mock_run.side_effect = subprocess.CalledProcessError(
                 returncode=1,
                 cmd="ffmpeg ...",
-                stderr="ffmpeg: error while loading shared libraries"
+                stderr=b"ffmpeg: error while loading shared libraries"
             )
 
             # Execute & Verify
@@ -69,35 +69,68 @@ class TestLoadAudioAsWaveform:
             assert "ffmpeg: error while loading shared libraries" in str(excinfo.value)
 
     @patch("app.processors.diarize.subprocess.run")
-    @patch("os.path.exists")
-    @patch("os.unlink")
-    def test_load_audio_ffmpeg_success(self, mock_unlink, mock_exists, mock_run):
-        """Test that ffmpeg success works correctly."""
+    def test_load_audio_ffmpeg_success(self, mock_run):
+        """Test that ffmpeg PCM on stdout becomes a 16kHz mono waveform."""
         # Setup: Direct load fails
         with patch("app.processors.diarize.torchaudio") as mock_torchaudio, \
+             patch("app.processors.diarize.torch") as mock_torch, \
              patch("app.processors.diarize.HAS_DIARIZE_DEPS", True):
-            mock_load = mock_torchaudio.load
-            test_waveform = MagicMock()
-            test_waveform.shape = [1, 16000]
-            mock_load.side_effect = [Exception("Direct load failed"), (test_waveform, 16000)]
+            mock_torchaudio.load.side_effect = Exception("Direct load failed")
 
-            # Setup: ffmpeg succeeds
-            mock_run.return_value = MagicMock(returncode=0)
-            mock_exists.return_value = True
+            # Setup: ffmpeg succeeds with two s16le samples (0 and half scale)
+            mock_run.return_value = MagicMock(returncode=0, stdout=b"\x00\x00\x00\x40")
 
             # Execute
             waveform, sample_rate = _load_audio_as_waveform("audio.m4a")
 
             # Verify
-            assert waveform == test_waveform
             assert sample_rate == 16000
+            samples = mock_torch.from_numpy.call_args[0][0]
+            assert samples.tolist() == [0.0, 0.5]
+            assert waveform == mock_torch.from_numpy.return_value.unsqueeze.return_value
             mock_run.assert_called_once()
+            # Only the direct attempt; the fallback never round-trips a temp WAV
+            mock_torchaudio.load.assert_called_once()
 
-            # Verify absolute path is used for input file
+            # Verify absolute path is used for input file, and PCM goes to stdout
             call_args = mock_run.call_args[0][0]
             assert "-i" in call_args
             input_idx = call_args.index("-i") + 1
             input_path = call_args[input_idx]
             assert os.path.isabs(input_path), f"Input path '{input_path}' should be absolute"
+            assert call_args[-3:] == ["-f", "s16le", "-"]
+
+    def test_resampler_is_reused_across_loads(self):
+        """Test that loads at the same sample rate share one Resample transform."""
+        _resampler_cache.clear()
+        with patch("app.processors.diarize.torchaudio") as mock_torchaudio, \
+             patch("app.processors.diarize.HAS_DIARIZE_DEPS", True):
+            test_waveform = MagicMock()
+            test_waveform.shape = [1, 44100]
+            mock_torchaudio.load.return_value = (test_waveform, 44100)
+            mock_torchaudio.transforms.Resample.return_value.return_value = test_waveform
+
+            _load_audio_as_waveform("first.wav")
+            _, sample_rate = _load_audio_as_waveform("second.wav")
+
+            assert sample_rate == 16000
+            mock_torchaudio.transforms.Resample.assert_called_once_with(44100, 16000)
+        _resampler_cache.clear()
+
+    @pytest.mark.parametrize("pin_memory", [False, True])
+    def test_pin_memory_only_when_requested(self, pin_memory):
+        """Test that the waveform is page-locked only for CUDA pipelines."""
+        with patch("app.processors.diarize.torchaudio") as mock_torchaudio, \
+             patch("app.processors.diarize.HAS_DIARIZE_DEPS", True):
+            test_waveform = MagicMock()
+            test_waveform.shape = [1, 16000]
+            mock_torchaudio.load.return_value = (test_waveform, 16000)
+
+            waveform, _ = _load_audio_as_waveform("audio.wav", pin_memory=pin_memory)
 
-            mock_unlink.assert_called_once()
+            if pin_memory:
+                test_waveform.pin_memory.assert_called_once()
+                assert waveform == test_waveform.pin_memory.return_value
+            else:
+                test_waveform.pin_memory.assert_not_called()
+                assert waveform == test_waveform
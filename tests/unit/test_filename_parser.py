@@ -141,6 +141,15 @@ class TestContactNameExtraction:
         assert result.caller_name == "Office 5551234"
         assert result.phone_number is None
 
+    def test_non_ascii_identifier_with_dense_digits(self) -> None:
+        """Digit density is measured the same way for non-ASCII identifiers."""
+        filename = "Call recording אבא 0501234567_200605_114902.m4a"
+        result = parse_recording_filename(filename)
+
+        # 10 digits out of 14 characters -> phone number
+        assert result.phone_number == "0501234567"
+        assert result.caller_name is None
+
 
 class TestNormalizePhoneNumber:
     """Tests for phone number normalization."""
@@ -161,6 +170,10 @@ class TestNormalizePhoneNumber:
         """Remove spaces and dashes."""
         assert normalize_phone_number("+1 (555) 123-4567") == "+15551234567"
 
+    def test_keeps_non_ascii_digits(self) -> None:
+        """Non-ASCII digits count as digits, like the regex path."""
+        assert normalize_phone_number("+٩٧٢-٥٠") == "+٩٧٢٥٠"
+
     def test_too_short_returns_none(self) -> None:
         """Very short numbers return None."""
         assert normalize_phone_number("12") is None
@@ -1,6 +1,9 @@
 """Unit tests for the folder watcher module."""
 
+import math
+import os
 import tempfile
+import threading
 import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -11,6 +14,13 @@ from app.db.models import RecordingStatus
 from app.watcher.folder_watcher import FolderWatcher
 
 
+def _inserted_rows(mock_session: MagicMock) -> list[dict]:
+    """Rows passed to the bulk INSERT in process_batch."""
+    call_args = mock_session.execute.call_args
+    assert call_args is not None
+    return call_args[0][1]
+
+
 class TestIsFileReady:
     """Tests for file readiness detection."""
 
@@ -103,6 +113,20 @@ class TestIsFileReady:
 
         assert watcher.is_file_ready(missing_file) is False
 
+    def test_uses_provided_stat(self, tmp_path: Path) -> None:
+        """A stat result from the scan is used instead of stat'ing again."""
+        test_file = tmp_path / "test.m4a"
+        test_file.write_bytes(b"stable content")
+        old_mtime = time.time() - 60
+        os.utime(test_file, (old_mtime, old_mtime))
+        file_stat = test_file.stat()
+
+        watcher = FolderWatcher(folder=tmp_path, stable_seconds=10)
+
+        with patch.object(Path, "stat", side_effect=AssertionError("unexpected stat")):
+            assert watcher.is_file_ready(test_file, file_stat) is False
+            assert watcher.is_file_ready(test_file, file_stat) is True
+
 
 class TestScanFolder:
     """Tests for folder scanning."""
@@ -137,6 +161,14 @@ class TestScanFolder:
         assert len(files) == 1
         assert files[0].name == "audio.m4a"
 
+    def test_configured_extensions_are_case_insensitive(self, tmp_path: Path) -> None:
+        """Uppercase configured extensions still match lowercase files."""
+        (tmp_path / "audio.m4a").write_bytes(b"test")
+
+        watcher = FolderWatcher(folder=tmp_path, audio_extensions=(".M4A",))
+
+        assert [f.name for f in watcher.scan_folder()] == ["audio.m4a"]
+
     def test_empty_folder(self, tmp_path: Path) -> None:
         """Empty folder returns empty list."""
         watcher = FolderWatcher(folder=tmp_path)
@@ -144,6 +176,27 @@ class TestScanFolder:
 
         assert files == []
 
+    def test_finds_files_in_subfolders(self, tmp_path: Path) -> None:
+        """Scans nested folders recursively."""
+        nested = tmp_path / "2024" / "01"
+        nested.mkdir(parents=True)
+        (nested / "deep.m4a").write_bytes(b"test")
+        (tmp_path / "top.mp3").write_bytes(b"test")
+
+        watcher = FolderWatcher(folder=tmp_path)
+
+        assert sorted(f.name for f in watcher.scan_folder()) == ["deep.m4a", "top.mp3"]
+
+    def test_scan_folder_stats_returns_sizes(self, tmp_path: Path) -> None:
+        """Stat results come back alongside the paths."""
+        (tmp_path / "audio.m4a").write_bytes(b"12345")
+        (tmp_path / "notes.txt").write_bytes(b"ignored")
+
+        watcher = FolderWatcher(folder=tmp_path)
+        files = watcher.scan_folder_stats()
+
+        assert [(f.name, st.st_size) for f, st in files] == [("audio.m4a", 5)]
+
 
 class TestCleanStaleCache:
     """Tests for stale cache cleanup."""
@@ -167,6 +220,15 @@ class TestCleanStaleCache:
         assert "/path/to/file2.m4a" not in watcher._last_sizes
         assert "/path/to/file3.m4a" not in watcher._last_sizes
 
+    def test_forgets_known_files_that_were_removed(self, tmp_path: Path) -> None:
+        """Known-file entries are dropped with the size cache."""
+        watcher = FolderWatcher(folder=tmp_path)
+        watcher._known_files = {"/path/to/file1.m4a", "/path/to/file2.m4a"}
+
+        watcher.clean_stale_cache({"/path/to/file1.m4a"})
+
+        assert watcher._known_files == {"/path/to/file1.m4a"}
+
 
 class TestProcessBatch:
     """Tests for batch file processing."""
@@ -195,7 +257,7 @@ class TestProcessBatch:
         result = watcher.process_batch([test_file])
 
         assert result == 1
-        mock_session.add_all.assert_called_once()
+        mock_session.execute.assert_called_once()
         mock_session.commit.assert_called_once()
 
     @patch("app.watcher.folder_watcher.SyncSessionLocal")
@@ -219,12 +281,9 @@ class TestProcessBatch:
         watcher = FolderWatcher(folder=tmp_path)
         watcher.process_batch([test_file])
 
-        call_args = mock_session.add_all.call_args
-        assert call_args is not None
-        # add_all takes a list
-        recordings = call_args[0][0]
+        recordings = _inserted_rows(mock_session)
         assert len(recordings) == 1
-        assert recordings[0].status == RecordingStatus.QUEUED
+        assert recordings[0]["status"] == RecordingStatus.QUEUED
 
     @patch("app.watcher.folder_watcher.SyncSessionLocal")
     @patch("app.watcher.folder_watcher.compute_file_hash")
@@ -262,7 +321,7 @@ class TestProcessBatch:
         result = watcher.process_batch([test_file])
 
         assert result == 0
-        mock_session.add_all.assert_not_called()
+        mock_session.execute.assert_not_called()
 
     @patch("app.watcher.folder_watcher.SyncSessionLocal")
     @patch("app.watcher.folder_watcher.compute_file_hash")
@@ -290,11 +349,184 @@ class TestProcessBatch:
 
         assert result == 1
 
-        call_args = mock_session.add_all.call_args
-        assert call_args is not None
-        recordings = call_args[0][0]
+        recordings = _inserted_rows(mock_session)
         assert len(recordings) == 1
 
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_known_files_skip_hash_and_query_on_later_polls(
+        self,
+        mock_hash: MagicMock,
+        mock_session_class: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Files found in the database are not rechecked while they stay put."""
+        test_file = tmp_path / "test.m4a"
+        test_file.write_bytes(b"test content")
+
+        mock_hash.return_value = "abc123hash"
+        mock_existing = MagicMock()
+        mock_existing.file_hash = "abc123hash"
+
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.all.return_value = [mock_existing]
+        mock_session_class.return_value = mock_session
+
+        watcher = FolderWatcher(folder=tmp_path)
+        assert watcher.process_batch([test_file]) == 0
+        sessions_opened = mock_session_class.call_count
+        assert watcher.process_batch([test_file]) == 0
+
+        mock_hash.assert_called_once()
+        assert mock_session_class.call_count == sessions_opened
+
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_rewritten_known_file_is_checked_again(
+        self,
+        mock_hash: MagicMock,
+        mock_session_class: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """A known file rewritten in place is hashed and looked up again."""
+        test_file = tmp_path / "test.m4a"
+        test_file.write_bytes(b"old content")
+        old_mtime = time.time() - 120
+        os.utime(test_file, (old_mtime, old_mtime))
+
+        mock_hash.side_effect = lambda x: f"hash_{Path(x).read_bytes().decode()}"
+        mock_duplicate = MagicMock()
+        mock_duplicate.file_hash = "hash_old content"
+
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.all.side_effect = [
+            [],  # Paths found
+            [mock_duplicate],  # Hashes found: a copy of a recorded file
+            [],  # Paths found after the rewrite
+            [],  # Hashes found after the rewrite
+        ]
+        mock_session_class.return_value = mock_session
+
+        watcher = FolderWatcher(folder=tmp_path, poll_interval=30, stable_seconds=10)
+        watcher.is_file_ready(test_file)
+        assert watcher.is_file_ready(test_file) is True
+        assert watcher.process_batch([test_file]) == 0
+
+        # Same size, caught mid-write by a poll
+        test_file.write_bytes(b"new content")
+        assert watcher.is_file_ready(test_file) is False
+
+        new_mtime = time.time() - 60
+        os.utime(test_file, (new_mtime, new_mtime))
+        assert watcher.is_file_ready(test_file) is True
+        assert watcher.process_batch([test_file]) == 1
+
+        assert mock_hash.call_count == 2
+        assert _inserted_rows(mock_session)[0]["file_hash"] == "hash_new content"
+
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_files_known_by_path_are_not_hashed(
+        self,
+        mock_hash: MagicMock,
+        mock_session_class: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Paths are checked before hashing, so recorded files are never read."""
+        known = tmp_path / "known.m4a"
+        known.write_bytes(b"known")
+        new = tmp_path / "new.m4a"
+        new.write_bytes(b"new")
+
+        mock_hash.side_effect = lambda x: f"hash_{Path(x).name}"
+
+        mock_existing = MagicMock()
+        mock_existing.file_path = str(known.absolute())
+
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.all.side_effect = [
+            [mock_existing],  # Paths found
+            [],  # Hashes found
+        ]
+        mock_session_class.return_value = mock_session
+
+        watcher = FolderWatcher(folder=tmp_path)
+        result = watcher.process_batch([known, new])
+
+        assert result == 1
+        mock_hash.assert_called_once_with(str(new))
+        recordings = _inserted_rows(mock_session)
+        assert [r["file_name"] for r in recordings] == ["new.m4a"]
+
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_dedups_large_batch_hashed_in_parallel(
+        self,
+        mock_hash: MagicMock,
+        mock_session_class: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Parallel hashing keeps dedup exact across a larger batch."""
+        files = []
+        for i in range(50):
+            f = tmp_path / f"file{i:02d}.m4a"
+            f.write_bytes(b"content")
+            files.append(f)
+
+        # Every pair of files shares content -> 25 distinct hashes
+        mock_hash.side_effect = lambda x: f"hash_{int(Path(x).stem[4:]) // 2}"
+
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.all.return_value = []
+        mock_session_class.return_value = mock_session
+
+        watcher = FolderWatcher(folder=tmp_path, hash_workers=8)
+        result = watcher.process_batch(files)
+
+        assert result == 25
+        recordings = _inserted_rows(mock_session)
+        assert [r["file_name"] for r in recordings] == [f"file{i:02d}.m4a" for i in range(0, 50, 2)]
+
+
+class TestHashFiles:
+    """Tests for concurrent file hashing."""
+
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_hashes_files_concurrently(self, mock_hash: MagicMock, tmp_path: Path) -> None:
+        """Files are hashed on several threads at once."""
+        files = [tmp_path / f"f{i}.m4a" for i in range(4)]
+        barrier = threading.Barrier(len(files), timeout=5)
+
+        def slow_hash(path: str) -> str:
+            # Only returns if all four hashes are in flight together
+            barrier.wait()
+            return f"hash_{Path(path).name}"
+
+        mock_hash.side_effect = slow_hash
+
+        watcher = FolderWatcher(folder=tmp_path, hash_workers=4)
+        hashes = watcher._hash_files(files)
+
+        assert list(hashes) == files
+        assert hashes[files[0]] == "hash_f0.m4a"
+
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_skips_unreadable_files(self, mock_hash: MagicMock, tmp_path: Path) -> None:
+        """Files that fail to hash are left out of the result."""
+        good = tmp_path / "good.m4a"
+        bad = tmp_path / "bad.m4a"
+
+        def hash_or_fail(path: str) -> str:
+            if Path(path) == bad:
+                raise OSError("unreadable")
+            return "good_hash"
+
+        mock_hash.side_effect = hash_or_fail
+
+        watcher = FolderWatcher(folder=tmp_path)
+
+        assert watcher._hash_files([bad, good]) == {good: "good_hash"}
+
 
 class TestPollOnce:
     """Tests for single poll operation."""
@@ -316,6 +548,33 @@ class TestPollOnce:
 
         assert stats["scanned"] == 0
 
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    def test_rechecks_known_files_every_recheck_polls(
+        self,
+        mock_session_class: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        """Known files are looked up in the database again every recheck_polls polls."""
+        test_file = tmp_path / "test.m4a"
+        test_file.write_bytes(b"test content")
+        old_mtime = time.time() - 60
+        os.utime(test_file, (old_mtime, old_mtime))
+
+        mock_existing = MagicMock()
+        mock_existing.file_path = str(test_file.absolute())
+        mock_session = MagicMock()
+        mock_session.query.return_value.filter.return_value.all.return_value = [mock_existing]
+        mock_session_class.return_value = mock_session
+
+        watcher = FolderWatcher(folder=tmp_path, stable_seconds=10, recheck_polls=3)
+        lookups = []
+        for _ in range(6):
+            watcher.poll_once()
+            lookups.append(mock_session.query.call_count)
+
+        # First sighting, lookup, recheck on poll 3, known twice, recheck on poll 6
+        assert lookups == [0, 1, 2, 2, 2, 3]
+
 
 class TestWatcherLifecycle:
     """Tests for watcher start/stop."""
@@ -329,6 +588,27 @@ class TestWatcherLifecycle:
 
         assert watcher._running is False
 
+    def test_stop_wakes_loop_without_waiting_for_poll_interval(self, tmp_path: Path) -> None:
+        """Stop ends the loop promptly even with a long poll interval."""
+        watcher = FolderWatcher(folder=tmp_path, poll_interval=60)
+        polled = threading.Event()
+
+        def poll_once() -> dict:
+            polled.set()
+            return {"scanned": 0, "ready": 0, "queued": 0, "skipped": 0, "synced": 0}
+
+        with patch.object(watcher, "poll_once", side_effect=poll_once):
+            thread = threading.Thread(target=watcher.start)
+            thread.start()
+            assert polled.wait(timeout=5)
+
+            started = time.monotonic()
+            watcher.stop()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 1
+
 
 class TestGetPendingCount:
     """Tests for pending file counting optimization."""
@@ -410,6 +690,58 @@ class TestGetPendingCount:
         # Total 4 calls to all()
         assert session.query.return_value.filter.return_value.all.call_count == 4
 
+    @pytest.mark.parametrize("db_batch_size", [100, 250, 1000])
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_batching_follows_db_batch_size(
+        self,
+        mock_hash: MagicMock,
+        mock_session_cls: MagicMock,
+        db_batch_size: int,
+        tmp_path: Path
+    ) -> None:
+        """Lookups are chunked by the configured db_batch_size."""
+        n_files = 250
+        watcher = FolderWatcher(folder=tmp_path, db_batch_size=db_batch_size)
+
+        for i in range(n_files):
+            (tmp_path / f"file_{i}.mp3").touch()
+
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = []
+        mock_hash.return_value = "dummy_hash"
+
+        watcher.get_pending_count_in_folder()
+
+        # Same number of path and hash batches, since no paths are found
+        expected_all_calls = 2 * math.ceil(n_files / db_batch_size)
+        assert session.query.return_value.filter.return_value.all.call_count == expected_all_calls
+
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_limit_stops_hashing_early(
+        self,
+        mock_hash: MagicMock,
+        mock_session_cls: MagicMock,
+        tmp_path: Path
+    ) -> None:
+        """With a limit, only enough candidates to reach it are hashed."""
+        watcher = FolderWatcher(folder=tmp_path)
+
+        for i in range(10):
+            (tmp_path / f"file_{i}.mp3").touch()
+
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        session.query.return_value.filter.return_value.all.return_value = []
+        mock_hash.side_effect = lambda x: f"hash_{Path(x).name}"
+
+        count = watcher.get_pending_count_in_folder(limit=3)
+
+        assert count == 3
+        assert mock_hash.call_count == 3
+
 
 class TestSyncFromSource:
     """Tests for syncing files from source folder."""
@@ -449,7 +781,7 @@ class TestSyncFromSource:
         # Mock DB to return empty (no processed files)
         session = MagicMock()
         mock_session_cls.return_value = session
-        session.query.return_value.all.return_value = []
+        session.query.return_value.filter.return_value.all.return_value = []
 
         mock_hash.return_value = "new_hash"
 
@@ -485,7 +817,7 @@ class TestSyncFromSource:
         # Mock DB empty
         session = MagicMock()
         mock_session_cls.return_value = session
-        session.query.return_value.all.return_value = []
+        session.query.return_value.filter.return_value.all.return_value = []
 
         watcher = FolderWatcher(
             folder=calls,
@@ -525,7 +857,7 @@ class TestSyncFromSource:
         # Let's say name is different in DB but hash is same (renamed file in source)
         mock_record.file_name = "old_name.mp3"
 
-        session.query.return_value.all.return_value = [mock_record]
+        session.query.return_value.filter.return_value.all.return_value = [mock_record]
 
         mock_hash.return_value = "known_hash"
 
@@ -562,7 +894,7 @@ class TestSyncFromSource:
 
         session = MagicMock()
         mock_session_cls.return_value = session
-        session.query.return_value.all.return_value = []
+        session.query.return_value.filter.return_value.all.return_value = []
 
         mock_hash.side_effect = lambda x: f"hash_{Path(x).name}"
 
@@ -581,6 +913,46 @@ class TestSyncFromSource:
         assert (calls / "file1.mp3").exists()
         assert not (calls / "file2.mp3").exists()
 
+    @patch("app.watcher.folder_watcher.SyncSessionLocal")
+    @patch("app.watcher.folder_watcher.compute_file_hash")
+    def test_hashes_only_enough_files_to_fill_batch(
+        self,
+        mock_hash: MagicMock,
+        mock_session_cls: MagicMock,
+        tmp_path: Path
+    ) -> None:
+        """Only the oldest files are hashed, skipping past processed ones."""
+        source = tmp_path / "source"
+        source.mkdir()
+        calls = tmp_path / "calls"
+        calls.mkdir()
+
+        for i in range(5):
+            (source / f"file{i}.mp3").write_text("content")
+            os.utime(source / f"file{i}.mp3", (i, i))
+
+        session = MagicMock()
+        mock_session_cls.return_value = session
+        processed = MagicMock()
+        processed.file_hash = "hash_file0.mp3"
+        session.query.return_value.filter.return_value.all.return_value = [processed]
+
+        mock_hash.side_effect = lambda x: f"hash_{Path(x).name}"
+
+        watcher = FolderWatcher(
+            folder=calls,
+            sync_enabled=True,
+            source_folder=source,
+            sync_batch_size=2
+        )
+
+        copied = watcher.sync_from_source()
+
+        assert copied == 2
+        assert sorted(f.name for f in calls.iterdir()) == ["file1.mp3", "file2.mp3"]
+        hashed = sorted(Path(c[0][0]).name for c in mock_hash.call_args_list)
+        assert hashed == ["file0.mp3", "file1.mp3", "file2.mp3"]
+
     @patch("app.watcher.folder_watcher.SyncSessionLocal")
     @patch("app.watcher.folder_watcher.compute_file_hash")
     def test_handles_copy_error(
@@ -599,7 +971,7 @@ class TestSyncFromSource:
 
         session = MagicMock()
         mock_session_cls.return_value = session
-        session.query.return_value.all.return_value = []
+        session.query.return_value.filter.return_value.all.return_value = []
 
         mock_hash.return_value = "hash"
 
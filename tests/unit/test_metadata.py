@@ -1,5 +1,6 @@
 """Unit tests for the metadata processor."""
 
+import hashlib
 import json
 import os
 import subprocess
@@ -27,6 +28,14 @@ class TestComputeFileHash:
         assert len(file_hash) == 64
         assert all(c in "0123456789abcdef" for c in file_hash)
 
+    def test_hash_matches_sha256_of_contents(self, tmp_path):
+        """Test that multi-buffer files hash to the SHA256 of their bytes."""
+        content = os.urandom(1024 * 1024 + 123)
+        audio_file = tmp_path / "large.m4a"
+        audio_file.write_bytes(content)
+
+        assert compute_file_hash(str(audio_file)) == hashlib.sha256(content).hexdigest()
+
     def test_different_files_have_different_hashes(self):
         """Test that different files produce different hashes."""
         with tempfile.NamedTemporaryFile(delete=False) as f1:
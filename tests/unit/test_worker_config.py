@@ -1,5 +1,9 @@
 """Unit tests for worker-related config and Celery app (no DB/Redis)."""
 
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
 
 
@@ -62,3 +66,32 @@ class TestCeleryAppLoads:
             assert soft == limit - 60
         else:
             assert soft is None
+
+
+@pytest.mark.unit
+class TestWorkerProcessInit:
+    """Test the per-process model warmup hook."""
+
+    def test_warmup_does_not_block_process_init(self) -> None:
+        """The hook returns well inside the prefork init budget while warmup runs."""
+        try:
+            from app.worker import tasks
+        except (ModuleNotFoundError, ImportError):
+            pytest.skip("worker/celery imports need DB driver (e.g. psycopg2)")
+
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_warmup() -> None:
+            started.set()
+            release.wait(timeout=10)
+
+        with patch.object(tasks, "warmup_diarization", side_effect=slow_warmup):
+            begin = time.monotonic()
+            tasks._warm_up_models()
+            elapsed = time.monotonic() - begin
+
+            assert started.wait(timeout=5)
+            release.set()
+
+        assert elapsed < 1